@@ -5,10 +5,14 @@ from flask_socketio import SocketIO
 import logging
 import atexit
 import os
+import multiprocessing
 from datetime import timedelta
 
 from webapp import create_app, socketio
 from webapp.services.scheduler import start_scheduler, shutdown_scheduler
+from webapp.config import close_db_pool
+from webapp.db import create_tables
+from webapp.services.extraction import extraction_service
 
 load_dotenv()
 
@@ -26,9 +30,18 @@ app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=14)
 # Initialize JWT with the app instance
 jwt = JWTManager(app)
 
-# Start scheduler
-start_scheduler()
-atexit.register(shutdown_scheduler)
+# Extraction workers are spawned processes that import this module again; only the main process starts things
+if multiprocessing.current_process().name == 'MainProcess':
+    # Apply pending schema migrations before anything queries the database
+    create_tables()
+
+    # Start the PDF/DOCX extraction workers before the scheduler and scans need them
+    extraction_service.start()
+
+    # Start scheduler
+    start_scheduler()
+    atexit.register(shutdown_scheduler)
+    atexit.register(close_db_pool)
 
 # Register blueprints
 from webapp.routes.keywords.keyword_routes import keyword_bp
@@ -1 +1,2 @@
 from .redis_cache import set_cache, get_cache, delete_cache
+from .keyword_registry import keyword_registry
@@ -0,0 +1,162 @@
+# keyword_registry.py
+
+import time
+import hashlib
+import logging
+import threading
+import redis
+from webapp.config import get_db_connection
+from webapp.utils.keyword_matcher import KeywordMatcher
+from .redis_cache import redis_client
+
+# Redis counter bumped whenever closing or directory keywords change, shared by all workers
+VERSION_KEY = 'keyword_registry_version'
+VERSION_CHECK_INTERVAL = 10  # Seconds between Redis version checks
+MAX_AGE = 300  # Reload anyway after this many seconds, in case Redis is unreachable
+
+CLOSING = 'closing'
+DIRECTORY = 'directory'
+
+
+class KeywordSet:
+    """
+    An immutable snapshot of keywords plus the compiled matchers derived from it.
+
+    Compiled objects are built on first use and kept for the lifetime of the
+    snapshot, so scrapers pay the compile cost once per keyword change instead
+    of once per page.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def derive(self, name, build):
+        """
+        Returns build(keywords), computing it only once for this snapshot.
+
+        Args:
+            name (str): Cache slot for the derived object.
+            build (callable): Receives the keyword tuple and returns the compiled object.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self.keywords)
+            return self._derived[name]
+
+    @property
+    def fingerprint(self):
+        """Stable hash of the keywords, to tell whether results computed with an earlier snapshot still hold."""
+        return self.derive('fingerprint', lambda keywords: hashlib.sha1("\n".join(keywords).encode('utf-8')).hexdigest())
+
+    @property
+    def matcher(self):
+        """Aho-Corasick matcher for substring matches, as the scrapers have always done."""
+        return self.derive('matcher', KeywordMatcher)
+
+    @property
+    def word_matcher(self):
+        """Aho-Corasick matcher that only reports whole-word matches."""
+        return self.derive('word_matcher', lambda keywords: KeywordMatcher(keywords, word_boundary=True))
+
+
+class KeywordRegistry:
+    """
+    Process-wide cache of closing and directory keywords.
+
+    Keywords are loaded from the database the first time they are needed and
+    then served from memory. Writers call invalidate(), which clears the local
+    cache and bumps a Redis version counter; other workers notice the new
+    version on their next lookup (checked at most every VERSION_CHECK_INTERVAL
+    seconds) and reload.
+    """
+
+    def __init__(self):
+        self._sets = {}  # (kind, tender_type) -> (KeywordSet, loaded_at)
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked_at = 0
+
+    def closing_keywords(self, db_connection=None):
+        """Returns the KeywordSet of closing keywords."""
+        return self._get(CLOSING, None, db_connection)
+
+    def directory_keywords(self, tender_type='Uploaded Websites', db_connection=None):
+        """Returns the KeywordSet of directory keywords for one tender type."""
+        return self._get(DIRECTORY, tender_type, db_connection)
+
+    def invalidate(self):
+        """Drops cached keywords here and in every other worker."""
+        with self._lock:
+            self._sets.clear()
+        try:
+            self._version = str(redis_client.incr(VERSION_KEY))
+            self._version_checked_at = time.monotonic()
+        except redis.RedisError as e:
+            logging.warning(f"Redis error while bumping keyword registry version: {e}")
+        logging.info("Keyword registry invalidated.")
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._version_checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self._version_checked_at = now
+
+        try:
+            version = redis_client.get(VERSION_KEY)
+        except redis.RedisError as e:
+            logging.warning(f"Redis error while checking keyword registry version: {e}")
+            return
+
+        if version != self._version:
+            with self._lock:
+                if self._version is not None:
+                    logging.info("Keyword registry version changed, reloading keywords.")
+                self._sets.clear()
+                self._version = version
+
+    def _get(self, kind, tender_type, db_connection):
+        self._check_version()
+        key = (kind, tender_type)
+
+        cached = self._sets.get(key)
+        if cached and time.monotonic() - cached[1] < MAX_AGE:
+            return cached[0]
+
+        keyword_set = KeywordSet(self._load(kind, tender_type, db_connection))
+        with self._lock:
+            self._sets[key] = (keyword_set, time.monotonic())
+        logging.debug(f"Loaded {len(keyword_set)} {kind} keywords for {tender_type or 'all tender types'}.")
+        return keyword_set
+
+    def _load(self, kind, tender_type, db_connection):
+        owns_connection = db_connection is None or db_connection.closed
+        if owns_connection:
+            db_connection = get_db_connection()
+
+        cur = db_connection.cursor()
+        try:
+            if kind == CLOSING:
+                cur.execute("SELECT keyword FROM closing_keywords;")
+            else:
+                cur.execute("SELECT keyword FROM directory_keywords WHERE tender_type = %s;", (tender_type,))
+            return [row[0] for row in cur.fetchall()]
+        finally:
+            cur.close()
+            if owns_connection:
+                db_connection.close()
+
+
+# Shared registry used by the scrapers and invalidated by the keyword routes
+keyword_registry = KeywordRegistry()
@@ -1 +1 @@
-from .config import get_db_connection
+from .config import get_db_connection, get_db_pool, close_db_pool
@@ -3,12 +3,60 @@ import pg8000
 from dotenv import load_dotenv
 import time
 import logging
+import threading
+from .pool import ConnectionPool
 
 # Load environment variables from .env file
 load_dotenv()
 
-def get_db_connection(retries=3, delay=5):
-    """Establish a database connection with retry logic."""
+# Pool sizing, overridable per deployment
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", 1800))  # Seconds before a connection is recycled
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # Seconds to wait for a free connection
+
+# PDF/DOCX extraction worker processes, 0 extracts inline in the calling thread
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", 2))
+EXTRACTION_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACTION_MAX_TASKS_PER_CHILD", 50))  # Documents before a worker is replaced
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", 60))  # Seconds allowed per document
+
+# HTTP timeouts and document downloads
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 10))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))  # Seconds between bytes, not for the whole body
+DOCUMENT_MAX_BYTES = int(os.getenv("DOCUMENT_MAX_BYTES", 50 * 1024 * 1024))  # Larger documents are skipped
+DOCUMENT_SPOOL_BYTES = int(os.getenv("DOCUMENT_SPOOL_BYTES", 2 * 1024 * 1024))  # Larger bodies go to a temp file
+DOCUMENT_CACHE_MAX_AGE_DAYS = int(os.getenv("DOCUMENT_CACHE_MAX_AGE_DAYS", 30))  # Cached extractions older than this are pruned
+
+# Shared HTTP client (webapp.utils.http_client)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 50))  # Hosts with a keep-alive pool
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 10))  # Open connections kept per host
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))  # Retries after connection errors, 429 and 5xx
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 1))  # Retries wait about factor * 2^attempt seconds
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", 60))  # Longest wait between retries, including Retry-After
+
+# Per-host politeness (webapp.utils.rate_limiter)
+HOST_MIN_INTERVAL = float(os.getenv("HOST_MIN_INTERVAL", 2))  # Seconds between requests to the same site
+HOST_INTERVAL_JITTER = float(os.getenv("HOST_INTERVAL_JITTER", 0.5))  # Up to this fraction of the interval is added at random
+SEARCH_ENGINE_MIN_INTERVAL = float(os.getenv("SEARCH_ENGINE_MIN_INTERVAL", 5))  # Seconds between queries to one search engine
+
+# Concurrent visits of search-result links (webapp.scrapers.crawl_engine)
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", 6))  # Per scan; visits only check out DB connections per statement
+CRAWL_PER_HOST_CONCURRENCY = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", 1))
+
+# Recrawl policy (webapp.db.recrawl_policy): how long a visited result link is left alone
+RECRAWL_TENDER_TTL_HOURS = float(os.getenv("RECRAWL_TENDER_TTL_HOURS", 24))  # Pages that had a closing date
+RECRAWL_EMPTY_TTL_HOURS = float(os.getenv("RECRAWL_EMPTY_TTL_HOURS", 12))  # Pages without one; doubles per consecutive miss
+RECRAWL_MAX_INTERVAL_DAYS = float(os.getenv("RECRAWL_MAX_INTERVAL_DAYS", 30))  # Upper bound of the backoff
+
+# Website scans pack several site: operators into one search (webapp.scrapers.query_planner)
+GOOGLE_MAX_QUERY_WORDS = int(os.getenv("GOOGLE_MAX_QUERY_WORDS", 32))  # Google ignores words past this limit
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def connect_db(retries=3, delay=5):
+    """Open a new raw database connection with retry logic."""
     attempt = 0
     while attempt < retries:
         try:
@@ -28,3 +76,38 @@ def get_db_connection(retries=3, delay=5):
                 time.sleep(delay)
             else:
                 raise Exception("Unable to connect to the database after several attempts.")
+
+
+def get_db_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    connect_db,
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                    timeout=DB_POOL_TIMEOUT
+                )
+    return _pool
+
+
+def get_db_connection(timeout=None):
+    """
+    Check a database connection out of the shared pool.
+
+    The returned connection is used exactly like a pg8000 connection; calling
+    close() (or leaving a `with` block) returns it to the pool.
+    """
+    return get_db_pool().getconn(timeout=timeout)
+
+
+def close_db_pool():
+    """Close all pooled connections, e.g. on application shutdown."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,288 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out of the pool in time."""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a raw pg8000 connection checked out from a ConnectionPool.
+
+    It behaves like the pg8000 connection it wraps (cursor, commit, rollback,
+    context manager ...) except that close() hands the connection back to the
+    pool instead of tearing down the socket, so existing call sites that do
+    `conn.close()` or `with get_db_connection() as conn:` keep working unchanged.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise AttributeError(f"Connection has already been returned to the pool ({name}).")
+        return getattr(self._raw, name)
+
+    @property
+    def closed(self):
+        return self._released
+
+    def close(self):
+        """Returns the connection to the pool. Safe to call more than once."""
+        if self._released:
+            return
+        self._released = True
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, self._created_at)
+
+    def discard(self):
+        """Closes the underlying socket instead of returning it, e.g. after a protocol error."""
+        if self._released:
+            return
+        self._released = True
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, self._created_at, discard=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __del__(self):
+        # Safety net for call sites that never close their connection
+        try:
+            if not self._released:
+                self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of database connections shared by the Flask blueprints and scrapers.
+
+    Args:
+        connect (callable): Factory returning a new raw DB-API connection.
+        min_size (int): Connections kept open even when idle.
+        max_size (int): Hard cap on open connections; further checkouts wait.
+        max_lifetime (float): Seconds after which a connection is recycled.
+        timeout (float): Seconds a checkout waits for a free connection.
+        health_check_after (float): Idle seconds after which a connection is pinged on checkout.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, max_lifetime=1800,
+                 timeout=30, health_check_after=30):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool sizing: min_size must be <= max_size and max_size >= 1.")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+
+        self._idle = deque()  # (raw, created_at, returned_at)
+        self._size = 0  # Open connections, idle or checked out
+        self._waiting = 0
+        self._closed = False
+        self._pid = os.getpid()
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'failed_health_checks': 0,
+            'peak_in_use': 0,
+        }
+
+    def getconn(self, timeout=None):
+        """
+        Checks a healthy connection out of the pool, opening a new one if allowed.
+
+        Returns:
+            PooledConnection: A proxy whose close() returns the connection to the pool.
+
+        Raises:
+            PoolTimeoutError: If the pool is saturated for longer than the timeout.
+        """
+        self._check_fork()
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            raw, created_at, returned_at = None, None, None
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeoutError("Connection pool has been closed.")
+
+                if not self._idle and self._size >= self.max_size:
+                    self._stats['waits'] += 1
+                    self._waiting += 1
+                    logging.warning(f"Database pool saturated ({self._size}/{self.max_size} in use), waiting for a connection.")
+                    try:
+                        while not self._idle and self._size >= self.max_size and not self._closed:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                self._stats['timeouts'] += 1
+                                raise PoolTimeoutError(
+                                    f"Timed out after {timeout}s waiting for a database connection.")
+                            self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+                    continue
+
+                if self._idle:
+                    raw, created_at, returned_at = self._idle.pop()  # LIFO keeps hot connections hot
+                else:
+                    self._size += 1  # Reserve the slot before connecting outside the lock
+
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                created_at = time.monotonic()
+                with self._cond:
+                    self._stats['created'] += 1
+            elif not self._is_usable(raw, created_at, returned_at):
+                self._close_raw(raw)
+                continue
+
+            with self._cond:
+                self._stats['checkouts'] += 1
+                in_use = self._size - len(self._idle)
+                self._stats['peak_in_use'] = max(self._stats['peak_in_use'], in_use)
+            return PooledConnection(self, raw, created_at)
+
+    def _is_usable(self, raw, created_at, returned_at):
+        """Recycles expired connections and pings the ones that sat idle for a while."""
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            with self._cond:
+                self._stats['recycled'] += 1
+            return False
+
+        if now - returned_at > self.health_check_after:
+            try:
+                cur = raw.cursor()
+                cur.execute("SELECT 1")
+                cur.fetchall()
+                cur.close()
+                raw.rollback()  # Don't leave the ping's implicit transaction open
+            except Exception as e:
+                logging.warning(f"Discarding pooled connection that failed its health check: {e}")
+                with self._cond:
+                    self._stats['failed_health_checks'] += 1
+                return False
+        return True
+
+    def _release(self, raw, created_at, discard=False):
+        if raw is None:
+            return
+
+        if os.getpid() != self._pid:
+            # Connection belongs to the parent process; never reuse it here
+            return
+
+        if not discard:
+            try:
+                raw.rollback()  # Never hand out a connection with an open transaction
+            except Exception as e:
+                logging.warning(f"Discarding pooled connection after failed rollback: {e}")
+                discard = True
+
+        expired = self.max_lifetime and time.monotonic() - created_at > self.max_lifetime
+        with self._cond:
+            keep = not (discard or expired or self._closed)
+            if keep:
+                self._idle.append((raw, created_at, time.monotonic()))
+            else:
+                if expired and not discard:
+                    self._stats['recycled'] += 1
+            self._cond.notify()
+
+        if not keep:
+            self._close_raw(raw)
+            self._fill()
+
+    def _close_raw(self, raw):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _fill(self):
+        """Opens connections until the pool holds at least min_size of them."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                raw = self._connect()
+            except Exception as e:
+                logging.error(f"Error pre-opening pooled database connection: {e}")
+                with self._cond:
+                    self._size -= 1
+                return
+            with self._cond:
+                self._stats['created'] += 1
+                self._idle.appendleft((raw, time.monotonic(), time.monotonic()))
+                self._cond.notify()
+
+    def _check_fork(self):
+        """Drops connections inherited from a parent process (e.g. gunicorn --preload)."""
+        if os.getpid() == self._pid:
+            return
+        with self._cond:
+            if os.getpid() != self._pid:
+                self._idle.clear()
+                self._size = 0
+                self._waiting = 0
+                self._pid = os.getpid()
+
+    def stats(self):
+        """Returns a snapshot of pool size and saturation counters."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                'size': self._size,
+                'idle': idle,
+                'in_use': self._size - idle,
+                'waiting': self._waiting,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'saturation': round((self._size - idle) / self.max_size, 2),
+                **self._stats,
+            }
+
+    def close(self):
+        """Closes every idle connection; checked-out ones are closed when returned."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for raw, _, _ in idle:
+            try:
+                raw.close()
+            except Exception:
+                pass
@@ -2,12 +2,16 @@
 
 from .db import (
     insert_tender_to_db,
+    upsert_tenders,
+    refresh_tender_statuses,
     get_keywords_and_terms,
     create_tables
 )
 
 __all__ = [
     'insert_tender_to_db',
+    'upsert_tenders',
+    'refresh_tender_statuses',
     'get_keywords_and_terms',
     'create_tables'
 ]
\ No newline at end of file
@@ -0,0 +1,191 @@
+import os
+import logging
+from datetime import datetime
+import asyncpg
+from webapp.config.config import DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_MAX_LIFETIME
+from webapp.db.db import TENDER_COLUMNS, _tender_row, tender_merge_sql
+from webapp.db.log_writer import SCRAPING_LOG_COLUMNS, NO_DATE_VISITS_UPDATE
+
+TASK_LOG_COLUMNS = ('task_id', 'user_id', 'log_entry', 'created_at')
+
+
+class AsyncRepository:
+    """
+    asyncpg-backed data access for asyncio crawlers.
+
+    Mirrors the blocking helpers in webapp.db (keyword lookups, tender upserts,
+    scraping_log and task_logs writes) on an asyncpg pool. Lookups run through
+    prepared statements and bulk writes go through copy_records_to_table, so an
+    event loop can persist results without handing off to pg8000 threads.
+
+    Usage:
+        repo = await AsyncRepository.create()
+        keywords = await repo.fetch_closing_keywords()
+        counts = await repo.upsert_tenders(tenders)
+        await repo.close()
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    @classmethod
+    async def create(cls, min_size=DB_POOL_MIN_SIZE, max_size=DB_POOL_MAX_SIZE):
+        """Opens an asyncpg pool using the same DB_* environment variables as get_db_connection."""
+        pool = await asyncpg.create_pool(
+            host=os.getenv("DB_HOST"),
+            database=os.getenv("DB_NAME"),
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            port=int(os.getenv("DB_PORT", 5432)),
+            min_size=min_size,
+            max_size=max_size,
+            max_inactive_connection_lifetime=DB_POOL_MAX_LIFETIME
+        )
+        logging.info("Async database pool created.")
+        return cls(pool)
+
+    async def close(self):
+        await self._pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    # Keyword lookups
+
+    async def _fetch_column(self, sql, *args):
+        async with self._pool.acquire() as conn:
+            stmt = await conn.prepare(sql)
+            return [row[0] for row in await stmt.fetch(*args)]
+
+    async def fetch_closing_keywords(self):
+        """Returns all closing keywords."""
+        return await self._fetch_column("SELECT keyword FROM closing_keywords")
+
+    async def fetch_directory_keywords(self, tender_type=None):
+        """Returns directory keywords, optionally filtered by tender_type."""
+        if tender_type:
+            return await self._fetch_column(
+                "SELECT keyword FROM directory_keywords WHERE tender_type = $1", tender_type)
+        return await self._fetch_column("SELECT keyword FROM directory_keywords")
+
+    async def fetch_search_terms(self):
+        """Returns all search terms."""
+        return await self._fetch_column("SELECT term FROM search_terms")
+
+    # Tenders
+
+    async def upsert_tenders(self, tenders):
+        """
+        Inserts or updates tenders by COPYing them into a staging table and merging on source_url.
+
+        Args:
+            tenders (iterable): Tender dictionaries, as accepted by webapp.db.upsert_tenders.
+
+        Returns:
+            dict: Counts of 'inserted', 'updated', 'unchanged', 'skipped' and 'title_duplicates'.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'title_duplicates': 0}
+        current_date = datetime.now().date()
+
+        # The merge cannot touch the same source_url twice, keep the last occurrence
+        rows_by_url = {}
+        total = 0
+        for tender_info in tenders:
+            total += 1
+            row = _tender_row(tender_info, current_date)
+            if row is None:
+                logging.warning(f"Skipping tender with missing required fields: {tender_info.get('title')}")
+                continue
+            rows_by_url[row[3]] = row
+        counts['skipped'] = total - len(rows_by_url)
+        if not rows_by_url:
+            return counts
+
+        columns = ", ".join(TENDER_COLUMNS)
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f'''
+                    CREATE TEMP TABLE tenders_staging ON COMMIT DROP AS
+                    SELECT {columns} FROM tenders WITH NO DATA
+                ''')
+                await conn.copy_records_to_table(
+                    'tenders_staging', records=list(rows_by_url.values()), columns=list(TENDER_COLUMNS))
+                results = await conn.fetch(tender_merge_sql('tenders_staging AS v'))
+
+        for row in results:
+            counts['inserted' if row['inserted'] else 'updated'] += 1
+            if row['title_duplicate']:
+                counts['title_duplicates'] += 1
+        counts['unchanged'] = len(rows_by_url) - len(results)
+        logging.info(f"Async tender upsert finished: {counts}")
+        return counts
+
+    # Scraping log
+
+    async def log_scraping_details_many(self, records):
+        """
+        Upserts scraping_log rows keyed by visiting_url through a COPY into a staging table.
+
+        Args:
+            records (iterable): Tuples in SCRAPING_LOG_COLUMNS order, as built by ScrapingLogWriter.add.
+
+        Returns:
+            int: The number of distinct URLs written.
+        """
+        rows_by_url = {record[1]: record for record in records}
+        if not rows_by_url:
+            return 0
+
+        columns = ", ".join(SCRAPING_LOG_COLUMNS)
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(f'''
+                    CREATE TEMP TABLE scraping_log_staging ON COMMIT DROP AS
+                    SELECT {columns} FROM scraping_log WITH NO DATA
+                ''')
+                await conn.copy_records_to_table(
+                    'scraping_log_staging', records=list(rows_by_url.values()), columns=list(SCRAPING_LOG_COLUMNS))
+                await conn.execute(f'''
+                    INSERT INTO scraping_log ({columns})
+                    SELECT {columns} FROM scraping_log_staging
+                    ON CONFLICT (visiting_url) DO UPDATE SET
+                        website_name = EXCLUDED.website_name,
+                        tenders_found = EXCLUDED.tenders_found,
+                        tender_title = EXCLUDED.tender_title,
+                        closing_date = EXCLUDED.closing_date,
+                        closing_keyword = EXCLUDED.closing_keyword,
+                        filtered_keyword = EXCLUDED.filtered_keyword,
+                        relevant = EXCLUDED.relevant,
+                        status = EXCLUDED.status,
+                        created_at = EXCLUDED.created_at,
+                        {NO_DATE_VISITS_UPDATE}
+                ''')
+        return len(rows_by_url)
+
+    # Task logs
+
+    async def add_task_logs(self, entries):
+        """
+        Appends task log entries with a single COPY.
+
+        Args:
+            entries (iterable): (task_id, user_id, log_entry) tuples; created_at is set to now.
+        """
+        now = datetime.now()
+        records = [(task_id, user_id, log_entry, now) for task_id, user_id, log_entry in entries]
+        if not records:
+            return 0
+
+        async with self._pool.acquire() as conn:
+            await conn.copy_records_to_table('task_logs', records=records, columns=list(TASK_LOG_COLUMNS))
+        return len(records)
+
+    async def fetch_task_logs(self, task_id, user_id):
+        """Returns (log_entry, created_at) records for one task."""
+        async with self._pool.acquire() as conn:
+            stmt = await conn.prepare(
+                "SELECT log_entry, created_at FROM task_logs WHERE task_id = $1 AND user_id = $2")
+            return [(row['log_entry'], row['created_at']) for row in await stmt.fetch(task_id, user_id)]
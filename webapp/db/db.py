@@ -1,63 +1,246 @@
 import pg8000
 from contextlib import closing
+from itertools import islice
 from webapp.config import get_db_connection
 from datetime import datetime
 import logging
 
-
-def insert_tender_to_db(tender_info, db_connection):
-    """Inserts or updates tender information into the database."""
-    cur = None  # Ensure cur is defined for the finally block
+# Number of tenders sent per multi-row INSERT statement / commit
+UPSERT_BATCH_SIZE = 500
+
+# Columns supplied by the tender upserts, in VALUES order. `status` is derived in SQL from closing_date.
+TENDER_COLUMNS = ('title', 'description', 'closing_date', 'source_url', 'scraped_at', 'format', 'tender_type')
+
+
+def normalized_title_sql(column):
+    """SQL expression for the normalized-title hash backing the idx_tenders_title_hash index."""
+    return f"md5(lower(regexp_replace(btrim({column}), '\\s+', ' ', 'g')))"
+
+
+def tender_status_sql(column):
+    """SQL expression deriving a tender's status from its closing date."""
+    return f"CASE WHEN {column} > CURRENT_DATE THEN 'open' ELSE 'closed' END"
+
+
+def _tender_row(tender_info, current_date):
+    """Builds the parameter tuple for one tender, or None if a required field is missing."""
+    if not tender_info.get('title') or not tender_info.get('source_url') or not tender_info.get('closing_date'):
+        return None
+
+    closing_date = tender_info['closing_date']
+    if isinstance(closing_date, datetime):
+        closing_date = closing_date.date()
+    scraped_at = tender_info.get('scraped_at') or current_date
+    if isinstance(scraped_at, datetime):
+        scraped_at = scraped_at.date()
+
+    return (
+        tender_info['title'],
+        tender_info.get('description', ''),
+        closing_date,
+        tender_info['source_url'],
+        scraped_at,
+        tender_info.get('format', 'HTML'),
+        tender_info['tender_type']
+    )
+
+
+def tender_merge_sql(source):
+    """
+    Builds the INSERT ... SELECT ... ON CONFLICT (source_url) statement merging tender rows from `source`.
+
+    Args:
+        source (str): A FROM item exposing TENDER_COLUMNS, aliased `v` (a VALUES list or a staging table).
+
+    Returns:
+        str: SQL returning (source_url, inserted, title_duplicate, status) for every row written. Rows
+        whose stored values already match are skipped. `inserted` tells inserts from updates via xmax and
+        `title_duplicate` flags another tender with the same normalized title under a different source_url.
+    """
+    columns = ", ".join(TENDER_COLUMNS)
+    return f'''
+        INSERT INTO tenders ({columns}, status)
+        SELECT v.title, v.description, v.closing_date::date, v.source_url, v.scraped_at::date,
+               v.format, v.tender_type, {tender_status_sql('v.closing_date::date')}
+        FROM {source}
+        ON CONFLICT (source_url) DO UPDATE SET
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            closing_date = EXCLUDED.closing_date,
+            status = EXCLUDED.status,
+            format = EXCLUDED.format,
+            scraped_at = EXCLUDED.scraped_at,
+            tender_type = EXCLUDED.tender_type
+        WHERE (tenders.title, tenders.description, tenders.closing_date, tenders.status,
+               tenders.format, tenders.scraped_at, tenders.tender_type)
+              IS DISTINCT FROM
+              (EXCLUDED.title, EXCLUDED.description, EXCLUDED.closing_date, EXCLUDED.status,
+               EXCLUDED.format, EXCLUDED.scraped_at, EXCLUDED.tender_type)
+        RETURNING tenders.source_url,
+                  (xmax = 0) AS inserted,
+                  EXISTS (
+                      SELECT 1 FROM tenders AS other
+                      WHERE {normalized_title_sql('other.title')} = {normalized_title_sql('tenders.title')}
+                        AND other.source_url <> tenders.source_url
+                  ) AS title_duplicate,
+                  tenders.status
+    '''
+
+
+def _upsert_tender_batch(cur, rows):
+    """Sends one multi-row upsert for the given parameter tuples and returns the RETURNING rows."""
+    placeholders = ", ".join(["(" + ", ".join(["%s"] * len(TENDER_COLUMNS)) + ")"] * len(rows))
+    cur.execute(
+        tender_merge_sql(f"(VALUES {placeholders}) AS v ({', '.join(TENDER_COLUMNS)})"),
+        [value for row in rows for value in row]
+    )
+    return cur.fetchall()
+
+
+def insert_tender_to_db(tender_info, db_connection=None):
+    """
+    Inserts or updates a single tender with one INSERT ... ON CONFLICT statement.
+
+    Args:
+        tender_info (dict): A dictionary containing all relevant information about the tender.
+        db_connection: An optional active database connection; one is checked out of the pool if omitted.
+
+    Returns:
+        bool: True if the operation was successful, False otherwise.
+    """
+    current_date = datetime.now().date()
+    row = _tender_row(tender_info, current_date)
+    if row is None:
+        logging.error("Tender '%s' is missing a title, source URL or closing date.", tender_info.get('title'))
+        return False
+
+    owns_connection = db_connection is None or db_connection.closed
+    if owns_connection:
+        db_connection = get_db_connection()
+
+    cur = db_connection.cursor()
     try:
-        logging.info("Starting insert for tender: %s", tender_info['title'])
-        cur = db_connection.cursor()
-        logging.debug(f"Cursor created: {cur}")
-
-        # Set status based on current date
-        current_date = datetime.now().date()
-        tender_info['status'] = 'open' if tender_info['closing_date'] > current_date else 'closed'
-
-        # SQL query to insert or update tender information
-        insert_sql = '''  
-            INSERT INTO tenders (title, description, closing_date, source_url, status, scraped_at, format, tender_type)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT(source_url) DO UPDATE SET
-                title = EXCLUDED.title,
-                description = EXCLUDED.description,
-                closing_date = EXCLUDED.closing_date,
-                status = EXCLUDED.status,
-                format = EXCLUDED.format,
-                scraped_at = EXCLUDED.scraped_at,
-                tender_type = EXCLUDED.tender_type
-        '''
-
-        # Prepare parameters for insertion
-        params = (
-            tender_info['title'],
-            tender_info.get('description', ''),  # Provide a default description if not found
-            tender_info['closing_date'],
-            tender_info['source_url'],
-            tender_info['status'],
-            tender_info['scraped_at'],
-            tender_info['format'],
-            tender_info['tender_type']
-        )
-
-        # Execute the insertion/updating query and commit
-        logging.info("Executing insert query for tender '%s'", tender_info['title'])
-        cur.execute(insert_sql, params)
+        results = _upsert_tender_batch(cur, [row])
         db_connection.commit()
-        logging.info("Successfully inserted/updated tender: %s", tender_info['title'])
-        return True  # Indicate success
 
+        if not results:
+            logging.info("Tender unchanged: %s", tender_info['title'])
+            return True
+
+        _, inserted, title_duplicate, status = results[0]
+        tender_info['status'] = status  # Callers read back the status derived by the database
+        if title_duplicate:
+            logging.warning(f"Duplicate title found for tender '{tender_info['title']}' under a different source URL.")
+        logging.info("Successfully %s tender: %s", "inserted" if inserted else "updated", tender_info['title'])
+        return True
     except Exception as e:
         db_connection.rollback()
         logging.error("Error inserting/updating tender '%s': %s", tender_info['title'], str(e))
-        return False  # Indicate failure
+        return False
     finally:
-        if cur and not cur.closed:  # Close the cursor only if open
-            cur.close()
-            logging.info("Cursor closed successfully.")  # Log cursor closure
+        cur.close()
+        if owns_connection:
+            db_connection.close()
+
+
+def upsert_tenders(tenders, db_connection=None, batch_size=UPSERT_BATCH_SIZE):
+    """
+    Inserts or updates many tenders using multi-row INSERT ... ON CONFLICT (source_url) statements.
+
+    Tenders are sent in batches of `batch_size` rows and each batch is committed once.
+    Rows whose stored values already match are left untouched and counted as unchanged.
+
+    Args:
+        tenders (iterable): A list or iterator of tender dictionaries.
+        db_connection: An optional active database connection; one is checked out of the pool if omitted.
+        batch_size (int): Number of tenders per statement and commit.
+
+    Returns:
+        dict: Counts of 'inserted', 'updated', 'unchanged', 'skipped', 'failed' and 'title_duplicates'.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'failed': 0, 'title_duplicates': 0}
+    owns_connection = db_connection is None or db_connection.closed
+    if owns_connection:
+        db_connection = get_db_connection()
+
+    current_date = datetime.now().date()
+    tenders = iter(tenders)
+    cur = db_connection.cursor()
+    try:
+        while True:
+            chunk = list(islice(tenders, batch_size))
+            if not chunk:
+                break
+
+            # A single statement cannot touch the same source_url twice, keep the last occurrence
+            rows_by_url = {}
+            for tender_info in chunk:
+                row = _tender_row(tender_info, current_date)
+                if row is None:
+                    logging.warning(f"Skipping tender with missing required fields: {tender_info.get('title')}")
+                    continue
+                rows_by_url[row[3]] = row
+            rows = list(rows_by_url.values())
+            counts['skipped'] += len(chunk) - len(rows)
+            if not rows:
+                continue
+
+            try:
+                results = _upsert_tender_batch(cur, rows)
+                db_connection.commit()
+            except Exception as e:
+                db_connection.rollback()
+                counts['failed'] += len(rows)
+                logging.error(f"Error upserting batch of {len(rows)} tenders: {str(e)}")
+                continue
+
+            for source_url, inserted, title_duplicate, _ in results:
+                counts['inserted' if inserted else 'updated'] += 1
+                if title_duplicate:
+                    counts['title_duplicates'] += 1
+                    logging.warning(f"Duplicate title found for tender at {source_url} under a different source URL.")
+            counts['unchanged'] += len(rows) - len(results)
+
+        logging.info(f"Tender upsert finished: {counts}")
+        return counts
+    finally:
+        cur.close()
+        if owns_connection:
+            db_connection.close()
+
+
+def refresh_tender_statuses(db_connection=None):
+    """
+    Closes every open tender whose closing date has passed, in a single set-based UPDATE.
+
+    The WHERE clause matches the partial idx_tenders_open_closing_date index, so the
+    cost depends on the number of open tenders rather than on the size of the table.
+
+    Returns:
+        int: The number of tenders that were closed.
+    """
+    owns_connection = db_connection is None or db_connection.closed
+    if owns_connection:
+        db_connection = get_db_connection()
+
+    cur = db_connection.cursor()
+    try:
+        cur.execute("""
+            UPDATE tenders SET status = 'closed'
+            WHERE status = 'open' AND closing_date <= CURRENT_DATE
+        """)
+        closed_count = cur.rowcount
+        db_connection.commit()
+        logging.info(f"Tender status refresh closed {closed_count} tenders.")
+        return closed_count
+    except Exception as e:
+        db_connection.rollback()
+        logging.error(f"Error refreshing tender statuses: {str(e)}")
+        return 0
+    finally:
+        cur.close()
+        if owns_connection:
+            db_connection.close()
 
 
 def get_keywords_and_terms(db_connection):
@@ -212,42 +395,15 @@ def remove_directory_keyword_from_db(cur, keyword):
 
 
 def create_tables():
-    """Creates the necessary tables in the database."""
-    connection = get_db_connection()
-    try:
-        with closing(connection) as conn:
-            cur = conn.cursor()
-
-            # SQL to create the tenders table if it doesn't exist
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS tenders (
-                    id SERIAL PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    closing_date DATE NOT NULL,
-                    source_url TEXT NOT NULL UNIQUE,
-                    status TEXT NOT NULL,
-                    format TEXT NOT NULL,
-                    scraped_at DATE NOT NULL,
-                    tender_type TEXT NOT NULL
-                )
-            ''')
-
-            # SQL to create the directory_keywords table if it doesn't exist
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS directory_keywords (
-                    id SERIAL PRIMARY KEY,
-                    keyword TEXT NOT NULL,
-                    tender_type TEXT NOT NULL  -- Link to tender_type
-                )
-            ''')
-
-            conn.commit()
-            logging.info("Tenders and directory_keywords tables created or already exist.")
+    """Creates the necessary tables and indexes by applying all pending schema migrations."""
+    # Imported here because the migrations themselves import helpers from this module
+    from webapp.db.migrate import run_migrations
 
+    try:
+        run_migrations()
     except Exception as e:
         logging.error("Error creating tables: %s", str(e))
 
 
 if __name__ == "__main__":
-    create_tables()
\ No newline at end of file
+    create_tables()
@@ -0,0 +1,180 @@
+import zlib
+import logging
+from webapp.config import get_db_connection
+from webapp.config.config import DOCUMENT_CACHE_MAX_AGE_DAYS
+
+COMPRESSION_LEVEL = 6
+
+
+class CachedDocument:
+    """The extracted text of a document as of its last download, plus the validators it was served with."""
+
+    def __init__(self, url, etag, last_modified, content_hash, format_type, title, description, text_compressed):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+        self.format = format_type
+        self.title = title
+        self.description = description
+        self._text_compressed = bytes(text_compressed)
+        self._text = None
+
+    @property
+    def text(self):
+        """The extracted text, decompressed on first access."""
+        if self._text is None:
+            self._text = zlib.decompress(self._text_compressed).decode('utf-8')
+        return self._text
+
+    def conditional_headers(self):
+        """Request headers that let the server answer 304 when the document has not changed."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def matches(self, document):
+        """
+        Checks whether a fresh download is the same document that was cached.
+
+        Args:
+            document (FetchedDocument): The response to the (conditional) request.
+
+        Returns:
+            bool: True on 304 Not Modified, a matching ETag or Last-Modified, or an identical body.
+        """
+        if document.not_modified:
+            return True
+        if self.etag and document.etag == self.etag:
+            return True
+        if self.last_modified and document.last_modified == self.last_modified:
+            return True
+        return document.content_hash is not None and document.content_hash == self.content_hash
+
+
+class DocumentCache:
+    """
+    Postgres-backed cache of extracted document text, keyed by URL.
+
+    An entry is only reused while the document is unchanged: the server
+    confirms it with 304 Not Modified or the same ETag/Last-Modified, or the
+    downloaded body hashes to the same SHA-256. Scheduled scans then skip
+    PyMuPDF, python-docx and BeautifulSoup for documents they have already
+    read. Text is stored zlib-compressed.
+
+    Usage:
+        cached = document_cache.get(url, db_connection)
+        document = fetch_document(url, headers={**headers, **cached.conditional_headers()})
+        if cached.matches(document): text = cached.text
+    """
+
+    def get(self, url, db_connection=None):
+        """
+        Looks up the cached extraction for a URL.
+
+        Returns:
+            CachedDocument: The cached entry, or None if there is none or the lookup failed.
+        """
+        owns_connection = db_connection is None or db_connection.closed
+        if owns_connection:
+            db_connection = get_db_connection()
+
+        cur = db_connection.cursor()
+        try:
+            cur.execute("""
+                SELECT url, etag, last_modified, content_hash, format, title, description, text_compressed
+                FROM document_cache WHERE url = %s
+            """, (url,))
+            row = cur.fetchone()
+            return CachedDocument(*row) if row else None
+        except Exception as e:
+            db_connection.rollback()
+            logging.error(f"Error reading document cache for {url}: {str(e)}")
+            return None
+        finally:
+            cur.close()
+            if owns_connection:
+                db_connection.close()
+
+    def store(self, url, document, format_type, text, title=None, description=None, db_connection=None):
+        """
+        Saves the extracted text of a freshly downloaded document.
+
+        Args:
+            url (str): The requested URL, which later lookups use (not the URL after redirects).
+            document (FetchedDocument): The downloaded document, for its validators.
+            format_type (str): 'PDF', 'DOCX' or 'HTML'.
+            text (str): The extracted text.
+            title (str, optional): The title found on the page.
+            description (str, optional): The description found on the page.
+
+        Returns:
+            bool: True if the entry was saved.
+        """
+        if document.content_hash is None:
+            return False
+
+        owns_connection = db_connection is None or db_connection.closed
+        if owns_connection:
+            db_connection = get_db_connection()
+
+        text = text or ''
+        cur = db_connection.cursor()
+        try:
+            cur.execute("""
+                INSERT INTO document_cache (url, etag, last_modified, content_hash, format, title, description,
+                                            text_compressed, text_length, updated_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())
+                ON CONFLICT (url) DO UPDATE SET
+                    etag = EXCLUDED.etag,
+                    last_modified = EXCLUDED.last_modified,
+                    content_hash = EXCLUDED.content_hash,
+                    format = EXCLUDED.format,
+                    title = EXCLUDED.title,
+                    description = EXCLUDED.description,
+                    text_compressed = EXCLUDED.text_compressed,
+                    text_length = EXCLUDED.text_length,
+                    updated_at = NOW()
+            """, (url, document.etag, document.last_modified, document.content_hash, format_type,
+                  title, description, zlib.compress(text.encode('utf-8'), COMPRESSION_LEVEL), len(text)))
+            db_connection.commit()
+            return True
+        except Exception as e:
+            db_connection.rollback()
+            logging.error(f"Error saving document cache for {url}: {str(e)}")
+            return False
+        finally:
+            cur.close()
+            if owns_connection:
+                db_connection.close()
+
+    def prune(self, max_age_days=DOCUMENT_CACHE_MAX_AGE_DAYS):
+        """
+        Deletes entries extracted more than max_age_days ago; they are re-extracted on the next visit.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        db_connection = get_db_connection()
+        cur = db_connection.cursor()
+        try:
+            cur.execute("DELETE FROM document_cache WHERE updated_at < NOW() - make_interval(days => %s)",
+                        (max_age_days,))
+            removed = cur.rowcount
+            db_connection.commit()
+            logging.info(f"Pruned {removed} document cache entries.")
+            return removed
+        except Exception as e:
+            db_connection.rollback()
+            logging.error(f"Error pruning document cache: {str(e)}")
+            return 0
+        finally:
+            cur.close()
+            db_connection.close()
+
+
+# Shared cache used by the scrapers
+document_cache = DocumentCache()
@@ -0,0 +1,170 @@
+import atexit
+import logging
+import threading
+from datetime import datetime
+from webapp.config import get_db_connection
+
+# Flush once this many distinct URLs are pending, or after FLUSH_INTERVAL seconds
+FLUSH_BATCH_SIZE = 100
+FLUSH_INTERVAL = 5
+# Attempts per record before it is dropped after repeated flush failures
+MAX_FLUSH_ATTEMPTS = 3
+
+SCRAPING_LOG_COLUMNS = ('website_name', 'visiting_url', 'tenders_found', 'tender_title', 'closing_date',
+                        'closing_keyword', 'filtered_keyword', 'relevant', 'status', 'created_at', 'no_date_visits')
+
+# Keeps a running count of consecutive visits without a closing date (see webapp.db.recrawl_policy)
+NO_DATE_VISITS_UPDATE = ("no_date_visits = CASE WHEN EXCLUDED.closing_date IS NULL "
+                         "THEN scraping_log.no_date_visits + 1 ELSE 0 END")
+
+
+class ScrapingLogWriter:
+    """
+    Write-behind sink for scraping_log rows.
+
+    Scraper threads hand records to add(), which only touches an in-memory buffer.
+    A background thread upserts the buffer in batches with
+    INSERT ... ON CONFLICT (visiting_url) DO UPDATE once it reaches `batch_size`
+    URLs or every `flush_interval` seconds. Records for the same URL are coalesced,
+    keeping the latest one, and no_date_visits counts the consecutive visits of a
+    URL that found no closing date. Pending records are flushed on close() and at exit.
+    """
+
+    def __init__(self, batch_size=FLUSH_BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = {}  # visiting_url -> (row, attempts)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # Serializes flushes so rows for one URL land in order
+        self._thread = None
+        self._stopping = False
+        atexit.register(self.close)
+
+    def add(self, website_name, visiting_url, tenders_found, tender_title, closing_date,
+            closing_keyword, filtered_keyword, is_relevant, status):
+        """Queues one scraping_log record without blocking on the database."""
+        if isinstance(is_relevant, str):
+            is_relevant = is_relevant.lower() == 'yes'
+
+        row = (
+            website_name,
+            visiting_url,
+            int(tenders_found or 0),
+            tender_title,
+            closing_date,
+            closing_keyword,
+            filtered_keyword,
+            bool(is_relevant),
+            status,
+            datetime.now(),  # When the page was visited, not when the row gets flushed
+            0 if closing_date else 1  # no_date_visits of a new row; existing rows are counted up in the upsert
+        )
+
+        with self._cond:
+            self._pending[visiting_url] = (row, 0)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        self._ensure_started()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='scraping-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            self.flush()
+
+    def flush(self):
+        """Writes every pending record now. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            written = 0
+            items = list(pending.values())
+            conn = None
+            try:
+                conn = get_db_connection()
+                cur = conn.cursor()
+                try:
+                    for start in range(0, len(items), self.batch_size):
+                        batch = items[start:start + self.batch_size]
+                        try:
+                            self._upsert(cur, [row for row, _ in batch])
+                            conn.commit()
+                            written += len(batch)
+                        except Exception as e:
+                            conn.rollback()
+                            logging.error(f"Error flushing {len(batch)} scraping_log rows: {str(e)}")
+                            self._requeue(batch)
+                finally:
+                    cur.close()
+            except Exception as e:
+                logging.error(f"Error flushing scraping_log rows: {str(e)}")
+                self._requeue(items[written:])
+            finally:
+                if conn is not None:
+                    conn.close()
+
+            logging.info(f"Flushed {written} scraping_log rows.")
+            return written
+
+    def _requeue(self, items):
+        """Puts failed rows back unless a newer record for the URL arrived meanwhile."""
+        with self._cond:
+            for row, attempts in items:
+                if attempts + 1 >= MAX_FLUSH_ATTEMPTS:
+                    logging.warning(f"Dropping scraping_log row for {row[1]} after {attempts + 1} failed flushes.")
+                    continue
+                self._pending.setdefault(row[1], (row, attempts + 1))
+
+    @staticmethod
+    def _upsert(cur, rows):
+        placeholders = ", ".join(["(" + ", ".join(["%s"] * len(SCRAPING_LOG_COLUMNS)) + ")"] * len(rows))
+        upsert_sql = f'''
+            INSERT INTO scraping_log ({", ".join(SCRAPING_LOG_COLUMNS)})
+            VALUES {placeholders}
+            ON CONFLICT (visiting_url) DO UPDATE SET
+                website_name = EXCLUDED.website_name,
+                tenders_found = EXCLUDED.tenders_found,
+                tender_title = EXCLUDED.tender_title,
+                closing_date = EXCLUDED.closing_date,
+                closing_keyword = EXCLUDED.closing_keyword,
+                filtered_keyword = EXCLUDED.filtered_keyword,
+                relevant = EXCLUDED.relevant,
+                status = EXCLUDED.status,
+                created_at = EXCLUDED.created_at,
+                {NO_DATE_VISITS_UPDATE}
+        '''
+        cur.execute(upsert_sql, [value for row in rows for value in row])
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending)
+
+    def close(self):
+        """Stops the background thread and flushes whatever is still pending."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+
+# Shared writer used by all scrapers in this process
+scraping_log_writer = ScrapingLogWriter()
@@ -0,0 +1,130 @@
+import re
+import pkgutil
+import logging
+import importlib
+from webapp.config import get_db_connection
+from webapp.db import migrations
+
+# Arbitrary key for pg_advisory_lock so concurrent workers don't migrate at the same time
+MIGRATION_LOCK_ID = 48151623
+
+MIGRATION_MODULE_PATTERN = re.compile(r'^m(\d{4})_(\w+)$')
+
+
+class MissingTableError(RuntimeError):
+    """Raised by a migration whose target table does not exist, so the migration is rolled back and retried later."""
+
+
+def table_exists(cur, table):
+    """Checks whether a table exists in the current search path."""
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (table,))
+    return cur.fetchone()[0]
+
+
+def require_table(cur, table):
+    """Raises MissingTableError unless the table exists."""
+    if not table_exists(cur, table):
+        raise MissingTableError(f"Table '{table}' does not exist.")
+
+
+def create_index(cur, name, table, definition, unique=False, where=None):
+    """
+    Creates an index if it does not exist yet.
+
+    Args:
+        cur: An open cursor.
+        name (str): The index name.
+        table (str): The table to index.
+        definition (str): The indexed columns or expressions, e.g. "closing_date, status".
+        unique (bool): Whether to create a unique index.
+        where (str, optional): Predicate for a partial index.
+
+    Raises:
+        MissingTableError: If the table does not exist; the migration then stays unapplied
+            instead of being recorded without its index.
+    """
+    require_table(cur, table)
+
+    cur.execute(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({definition})"
+        + (f" WHERE {where}" if where else "")
+    )
+
+
+def discover_migrations():
+    """Returns (version, name, module) tuples for all migration modules, ordered by version."""
+    found = []
+    for module_info in pkgutil.iter_modules(migrations.__path__):
+        match = MIGRATION_MODULE_PATTERN.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{migrations.__name__}.{module_info.name}")
+        found.append((int(match.group(1)), match.group(2), module))
+
+    found.sort(key=lambda migration: migration[0])
+    versions = [version for version, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions found: {versions}")
+    return found
+
+
+def get_schema_version(cur):
+    """Returns the highest applied migration version, or 0 for an untracked database."""
+    cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    return cur.fetchone()[0]
+
+
+def run_migrations(target=None):
+    """
+    Applies every pending migration in order, each in its own transaction.
+
+    Args:
+        target (int, optional): Stop after this version; defaults to the latest.
+
+    Returns:
+        int: The schema version after running.
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        cur.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        ''')
+        conn.commit()
+
+        current_version = get_schema_version(cur)
+        for version, name, module in discover_migrations():
+            if version <= current_version or (target is not None and version > target):
+                continue
+
+            logging.info(f"Applying migration {version:04d}_{name}...")
+            try:
+                module.upgrade(cur)
+                cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Migration {version:04d}_{name} failed: {str(e)}")
+                raise
+            current_version = version
+
+        logging.info(f"Database schema is at version {current_version}.")
+        return current_version
+    finally:
+        try:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+        except Exception as e:
+            logging.warning(f"Error releasing migration lock: {str(e)}")
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_migrations()
@@ -0,0 +1,5 @@
+# Ordered schema migrations, applied by webapp.db.migrate.run_migrations().
+#
+# Each module is named m<NNNN>_<description>.py and defines upgrade(cur). Migrations
+# must be idempotent (IF NOT EXISTS ...) so they can be safely re-run against
+# databases that were created before migrations were tracked.
@@ -0,0 +1,67 @@
+# Baseline schema previously created by webapp.db.db.create_tables()
+from webapp.db.db import normalized_title_sql
+from webapp.db.migrate import create_index
+
+
+def upgrade(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS tenders (
+            id SERIAL PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            closing_date DATE NOT NULL,
+            source_url TEXT NOT NULL UNIQUE,
+            status TEXT NOT NULL,
+            format TEXT NOT NULL,
+            scraped_at DATE NOT NULL,
+            tender_type TEXT NOT NULL
+        )
+    ''')
+
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS directory_keywords (
+            id SERIAL PRIMARY KEY,
+            keyword TEXT NOT NULL,
+            tender_type TEXT NOT NULL  -- Link to tender_type
+        )
+    ''')
+
+    # Tables the scrapers, scheduler and upload routes write to; later migrations index them
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS scraping_log (
+            id SERIAL PRIMARY KEY,
+            website_name TEXT,
+            visiting_url TEXT NOT NULL,
+            tenders_found INTEGER NOT NULL DEFAULT 0,
+            tender_title TEXT,
+            closing_date DATE,
+            closing_keyword TEXT,
+            filtered_keyword TEXT,
+            relevant BOOLEAN NOT NULL DEFAULT FALSE,
+            status TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    ''')
+
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS task_logs (
+            id SERIAL PRIMARY KEY,
+            task_id INTEGER NOT NULL,
+            user_id TEXT NOT NULL,  -- JWT identity (username)
+            log_entry TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    ''')
+
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS websites (
+            id SERIAL PRIMARY KEY,
+            name TEXT,
+            url TEXT NOT NULL,
+            location TEXT,
+            tender_type TEXT
+        )
+    ''')
+
+    # Title-based duplicate detection during tender upserts
+    create_index(cur, 'idx_tenders_title_hash', 'tenders', normalized_title_sql('title'))
@@ -0,0 +1,23 @@
+# Indexes for the columns the routes, scrapers and scheduler filter on
+from webapp.db.migrate import create_index
+
+
+def upgrade(cur):
+    # /api/tenders date-range filter and open/closed split
+    create_index(cur, 'idx_tenders_closing_date_status', 'tenders', 'closing_date, status')
+    # Per-source counts, e.g. the 'Uploaded Websites' open/closed totals
+    create_index(cur, 'idx_tenders_tender_type_status', 'tenders', 'tender_type, status')
+    # /api/tenders/expiring_soon only ever looks at open tenders
+    create_index(cur, 'idx_tenders_open_closing_date', 'tenders', 'closing_date', where="status = 'open'")
+
+    # Per-page log lookups by URL and date-based listing/cleanup
+    create_index(cur, 'idx_scraping_log_visiting_url', 'scraping_log', 'visiting_url')
+    create_index(cur, 'idx_scraping_log_created_at', 'scraping_log', 'created_at')
+
+    create_index(cur, 'idx_task_logs_task_user', 'task_logs', 'task_id, user_id')
+
+    # Upload de-duplication by URL and paginated listing by tender type
+    create_index(cur, 'idx_websites_url', 'websites', 'url')
+    create_index(cur, 'idx_websites_tender_type', 'websites', 'tender_type')
+
+    create_index(cur, 'idx_directory_keywords_tender_type', 'directory_keywords', 'tender_type')
@@ -0,0 +1,19 @@
+# One scraping_log row per visiting_url, so log writes can use INSERT ... ON CONFLICT (visiting_url)
+from webapp.db.migrate import create_index, require_table
+
+
+def upgrade(cur):
+    # Without this index every ScrapingLogWriter flush fails, so never record this migration without it
+    require_table(cur, 'scraping_log')
+
+    # Keep only the newest row for URLs that were logged twice by racing SELECT-then-INSERT writes
+    cur.execute('''
+        DELETE FROM scraping_log older
+        USING scraping_log newer
+        WHERE older.visiting_url = newer.visiting_url
+          AND older.id < newer.id
+    ''')
+
+    create_index(cur, 'uq_scraping_log_visiting_url', 'scraping_log', 'visiting_url', unique=True)
+    # Superseded by the unique index above
+    cur.execute("DROP INDEX IF EXISTS idx_scraping_log_visiting_url")
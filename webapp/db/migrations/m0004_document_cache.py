@@ -0,0 +1,22 @@
+# Extracted text of tender documents, reused while the document is unchanged (see webapp.db.document_cache)
+from webapp.db.migrate import create_index
+
+
+def upgrade(cur):
+    cur.execute('''
+        CREATE TABLE IF NOT EXISTS document_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT NOT NULL,  -- SHA-256 of the downloaded body
+            format TEXT NOT NULL,
+            title TEXT,
+            description TEXT,
+            text_compressed BYTEA NOT NULL,  -- zlib-compressed UTF-8 extracted text
+            text_length INTEGER NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    ''')
+
+    # Age-based pruning
+    create_index(cur, 'idx_document_cache_updated_at', 'document_cache', 'updated_at')
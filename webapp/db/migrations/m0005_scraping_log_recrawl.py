@@ -0,0 +1,9 @@
+# Consecutive visits without a closing date, so the recrawl policy can back off from such pages
+from webapp.db.migrate import require_table
+
+
+def upgrade(cur):
+    # Log upserts and the recrawl policy both use this column, so never record this migration without it
+    require_table(cur, 'scraping_log')
+
+    cur.execute("ALTER TABLE scraping_log ADD COLUMN IF NOT EXISTS no_date_visits INTEGER NOT NULL DEFAULT 0")
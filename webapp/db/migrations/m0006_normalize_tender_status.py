@@ -0,0 +1,13 @@
+# Re-derive status for tenders written before it came from SQL (some scrapers stored 'Open'/'Closed'),
+# so /api/tenders can filter on the exact values 'open' and 'closed'
+from webapp.db.db import tender_status_sql
+from webapp.db.migrate import require_table
+
+
+def upgrade(cur):
+    require_table(cur, 'tenders')
+
+    cur.execute(f'''
+        UPDATE tenders SET status = {tender_status_sql('closing_date')}
+        WHERE status IS DISTINCT FROM {tender_status_sql('closing_date')}
+    ''')
@@ -0,0 +1,88 @@
+import logging
+from datetime import datetime, timedelta
+from webapp.config import get_db_connection
+from webapp.config.config import RECRAWL_TENDER_TTL_HOURS, RECRAWL_EMPTY_TTL_HOURS, RECRAWL_MAX_INTERVAL_DAYS
+
+
+class RecrawlPolicy:
+    """
+    Decides which search-result links are worth visiting again, based on scraping_log.
+
+    scraping_log keeps the last visit of every URL. A page that had a closing
+    date is left alone for `tender_ttl`; a page without one for `empty_ttl`,
+    doubled for every further consecutive visit that found none
+    (no_date_visits), up to `max_interval`. URLs that were never visited are
+    always due.
+
+    Args:
+        tender_ttl (timedelta): Freshness window of pages that had a tender.
+        empty_ttl (timedelta): Freshness window after the first visit without a closing date.
+        max_interval (timedelta): Longest time a page without closing dates is skipped.
+
+    Usage:
+        due = recrawl_policy.due_urls([url for url, _, _ in visits], db_connection)
+        visits = [visit for visit in visits if visit[0] in due]
+    """
+
+    def __init__(self, tender_ttl=timedelta(hours=RECRAWL_TENDER_TTL_HOURS),
+                 empty_ttl=timedelta(hours=RECRAWL_EMPTY_TTL_HOURS),
+                 max_interval=timedelta(days=RECRAWL_MAX_INTERVAL_DAYS)):
+        self.tender_ttl = tender_ttl
+        self.empty_ttl = empty_ttl
+        self.max_interval = max_interval
+
+    def interval(self, had_closing_date, no_date_visits):
+        """Time to wait after a visit before the page is due again."""
+        if had_closing_date:
+            return self.tender_ttl
+        misses = max(1, no_date_visits or 0)
+        # Cap the exponent so long streaks cannot overflow timedelta
+        return min(self.max_interval, self.empty_ttl * 2 ** min(misses - 1, 20))
+
+    def due_urls(self, urls, db_connection=None):
+        """
+        Filters candidate URLs down to those due for a visit, with one indexed lookup for the whole batch.
+
+        Args:
+            urls (iterable): Candidate URLs, as they are logged in scraping_log.visiting_url.
+            db_connection: Optional open connection; a pooled one is used otherwise.
+
+        Returns:
+            set: The URLs to visit. Every URL is returned if the lookup fails, so a database
+            problem never stops a scan.
+        """
+        urls = set(urls)
+        if not urls:
+            return set()
+
+        owns_connection = db_connection is None or db_connection.closed
+        if owns_connection:
+            db_connection = get_db_connection()
+
+        cur = db_connection.cursor()
+        try:
+            # visiting_url has a unique index (m0003), so this is one index scan per batch
+            cur.execute("""
+                SELECT visiting_url, created_at, closing_date, no_date_visits
+                FROM scraping_log WHERE visiting_url = ANY(%s)
+            """, (list(urls),))
+            rows = cur.fetchall()
+        except Exception as e:
+            db_connection.rollback()
+            logging.error(f"Error reading recrawl history: {str(e)}")
+            return urls
+        finally:
+            cur.close()
+            if owns_connection:
+                db_connection.close()
+
+        now = datetime.now()  # scraping_log.created_at is local time, see ScrapingLogWriter.add
+        fresh = {
+            url for url, visited_at, closing_date, no_date_visits in rows
+            if visited_at is not None and now < visited_at + self.interval(closing_date is not None, no_date_visits)
+        }
+        return urls - fresh
+
+
+# Shared policy used by the search-engine scrapers
+recrawl_policy = RecrawlPolicy()
@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 import bcrypt
 from webapp.config.config import get_db_connection
-import requests
+from webapp.utils.http_client import http_client
 import os
 from dotenv import load_dotenv
 
@@ -27,10 +27,11 @@ def login():
     # Skip reCAPTCHA for localhost or 127.0.0.1
     if not (request.host.startswith('localhost') or request.host.startswith('127.0.0.1')) and \
             'PostmanRuntime' not in request.headers.get('User-Agent', ''):
-        recaptcha_response = requests.post('https://www.google.com/recaptcha/api/siteverify', data={
+        # Tokens are single-use, so a failed verification is not retried
+        recaptcha_response = http_client.post('https://www.google.com/recaptcha/api/siteverify', data={
             'secret': recaptcha_secret_key,  # Use the secret key from the environment
             'response': recaptcha_token
-        })
+        }, retries=0, throttle=False)
         recaptcha_result = recaptcha_response.json()
         if not recaptcha_result.get('success'):
             return jsonify({"msg": "Invalid reCAPTCHA, please try again."}), 400
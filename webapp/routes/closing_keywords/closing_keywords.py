@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify
 from webapp.config import get_db_connection
 from flask_jwt_extended import jwt_required
 from webapp.cache.redis_cache import set_cache, get_cache, delete_cache
+from webapp.cache.keyword_registry import keyword_registry
 import logging
 from datetime import datetime  # Ensure you import datetime if not already
 
@@ -67,6 +68,7 @@ def create_closing_keyword():
 
         # Invalidate the cache
         delete_cache('closing_keywords')
+        keyword_registry.invalidate()
         logging.info("Cache invalidated after adding a new keyword.")
 
         return jsonify({"message": "Keyword added successfully"}), 201
@@ -101,6 +103,7 @@ def update_closing_keyword(keyword):
 
         # Invalidate cache
         delete_cache('closing_keywords')
+        keyword_registry.invalidate()
         logging.info("Cache invalidated after updating a closing keyword.")
 
         return jsonify({"message": "Closing keyword updated successfully"}), 200
@@ -128,6 +131,7 @@ def delete_closing_keyword(keyword):
 
         # Invalidate the cache
         delete_cache('closing_keywords')
+        keyword_registry.invalidate()
         logging.info("Cache invalidated after deleting a keyword.")
 
         return jsonify({"message": "Keyword deleted successfully"}), 200
@@ -3,13 +3,18 @@
 from .tenders import tenders_bp
 from webapp.routes.tenders.tender_utils import (
     extract_closing_dates,
+    iter_closing_dates,
+    find_closing_date,
     clean_date_string,
     parse_closing_date,
     is_valid_url,
     get_format,
     construct_search_url,
     extract_pdf_text,
+    iter_pdf_pages,
+    read_pdf_until_closing_date,
     extract_docx_text,
+    extract_html_details,
     extract_description_from_response,
     insert_tender_to_db
 )
@@ -17,13 +22,18 @@ from webapp.routes.tenders.tender_utils import (
 __all__ = [
     'tenders_bp',
     'extract_closing_dates',
+    'iter_closing_dates',
+    'find_closing_date',
     'clean_date_string',
     'parse_closing_date',
     'is_valid_url',
     'get_format',
     'construct_search_url',
     'extract_pdf_text',
+    'iter_pdf_pages',
+    'read_pdf_until_closing_date',
     'extract_docx_text',
+    'extract_html_details',
     'extract_description_from_response',
     'insert_tender_to_db'
 ]
\ No newline at end of file
@@ -4,8 +4,12 @@ from bs4 import BeautifulSoup
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 from io import BytesIO
+from lxml import etree  # Incremental HTML parsing for detail pages
 import fitz  # PyMuPDF for handling PDF files
 from docx import Document  # Ensure you have python-docx installed for handling DOCX files
+from webapp.db.db import insert_tender_to_db  # Single tender upsert, re-exported for existing callers
+from webapp.cache.keyword_registry import keyword_registry
+from webapp.utils.date_parser import parse_date, normalize_date_string
 
 # Configure logging for debugging and tracking purposes
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -45,38 +49,26 @@ def fetch_directory_keywords(db_connection, tender_type='Uploaded Websites'):
     cur.close()
     return keywords
 
-def is_relevant_tender(text: str, db_connection) -> str:
+def is_relevant_tender(text: str, db_connection=None) -> str:
     """
     Checks for the presence of directory keywords in the provided text and returns matched keywords.
 
     Args:
         text (str): The text to search for relevant keywords.
-        db_connection: The active database connection object.
+        db_connection: Optional database connection, only used when the keyword registry needs to reload.
 
     Returns:
         str: Comma-separated matched keywords in their original case, or None if no relevant keywords are found.
     """
-    directory_keywords = fetch_directory_keywords(db_connection, tender_type='Uploaded Websites')
+    directory_keywords = keyword_registry.directory_keywords('Uploaded Websites', db_connection)
     if not directory_keywords:
         logging.warning("No directory keywords found in the database for tender type 'Uploaded Websites'.")
         return None
 
-    # Log the fetched directory keywords
-    logging.debug(f"Fetched directory keywords: {directory_keywords}")
-
-    # Compile regex pattern for keywords
-    directory_keywords_pattern = r"|".join(map(re.escape, directory_keywords))
-    logging.debug(f"Using regex pattern: {directory_keywords_pattern}")
-
-    # Find all matches in the text while ignoring case
-    matches = re.findall(directory_keywords_pattern, text, re.IGNORECASE)
-
-    if matches:
-        # Normalize to lowercase and remove duplicates
-        unique_matches = set(keyword.lower() for keyword in matches)
-        # Retrieve original-cased words from the matches
-        final_keywords = [keyword for keyword in directory_keywords if keyword.lower() in unique_matches]
+    # Single pass over the text with the registry's shared automaton, keywords come back in original case
+    final_keywords = directory_keywords.matcher.find_all(text)
 
+    if final_keywords:
         # Log found keywords (original case)
         logging.debug(f"Matched keywords in original case: {final_keywords}")
 
@@ -86,37 +78,96 @@ def is_relevant_tender(text: str, db_connection) -> str:
     return None  # No relevant keywords found
 
 
+# Date shapes accepted after a closing keyword
+DATE_FORMATS = r"(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{1,2}\s*(?:AM|PM)?\s*on\s*\d{1,2}\s+\w+\s+\d{4}|" \
+               r"\w+\s+\d{1,2},\s+\d{4}|\d{1,2}\s+\w+\s+\d{4}|\d{1,2}\s+\w+\s+\d{2}|" \
+               r"\w+\s+\d{1,2}|\d{1,2}\s*[ -]\s*\d{1,2})"
+
+# How far past a closing keyword the date is looked for, so large documents are never scanned end to end
+CLOSING_DATE_WINDOW = 80
+
+
+def _compile_closing_keyword_pattern(closing_keywords):
+    return re.compile(r"|".join(map(re.escape, closing_keywords)), re.IGNORECASE)
+
+
+def _compile_closing_date_pattern(closing_keywords):
+    closing_keywords_pattern = r"|".join(map(re.escape, closing_keywords))
+    return re.compile(rf"({closing_keywords_pattern})[\s:]*({DATE_FORMATS})", re.IGNORECASE)
+
+
+def iter_closing_dates(text: str, db_connection=None, closing_keywords=None):
+    """
+    Lazily yields closing date candidates found in the text.
 
+    Only keyword hits are visited, and the date pattern is matched in a window of
+    CLOSING_DATE_WINDOW characters after each one, so a caller that stops at the
+    first usable date never scans the rest of the document.
 
+    Args:
+        text (str): The text to search for closing dates.
+        db_connection: Optional database connection, only used when the keyword registry needs to reload.
+        closing_keywords (KeywordSet): Keywords to use instead of the registry's, e.g. in extraction workers.
 
-def extract_closing_dates(text: str, db_connection) -> list:
+    Yields:
+        tuple: (date, keyword) in the order they appear in the text.
+    """
+    if closing_keywords is None:
+        closing_keywords = keyword_registry.closing_keywords(db_connection)
+    if not closing_keywords:
+        logging.warning("No closing keywords found in the database.")
+        return
+
+    # Both patterns are compiled once per keyword change and cached on the keyword set
+    keyword_pattern = closing_keywords.derive('closing_keyword_hits', _compile_closing_keyword_pattern)
+    date_pattern = closing_keywords.derive('closing_dates', _compile_closing_date_pattern)
+
+    position = 0
+    while True:
+        hit = keyword_pattern.search(text, position)
+        if hit is None:
+            return
+        match = date_pattern.match(text, hit.start(), hit.end() + CLOSING_DATE_WINDOW)
+        if match:
+            yield match.group(2), match.group(1)  # Date and corresponding keyword
+            position = match.end()
+        else:
+            position = hit.start() + 1
+
+
+def extract_closing_dates(text: str, db_connection=None) -> list:
     """
     Extracts closing dates from the provided text using regular expressions
-    and keywords fetched from the database.
+    and the closing keywords held by the keyword registry.
 
     Args:
         text (str): The text to search for closing dates.
-        db_connection: The active database connection object.
+        db_connection: Optional database connection, only used when the keyword registry needs to reload.
 
     Returns:
         list: A list of tuples containing closing date keywords and the corresponding dates.
     """
-    closing_keywords = fetch_closing_keywords(db_connection)
-    if not closing_keywords:
-        logging.warning("No closing keywords found in the database.")
-        return []
+    return list(iter_closing_dates(text, db_connection))
 
-    # Join keywords into a regex pattern
-    closing_keywords_pattern = r"|".join(map(re.escape, closing_keywords))
-    date_formats = r"(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{1,2}\s*(?:AM|PM)?\s*on\s*\d{1,2}\s+\w+\s+\d{4}|" \
-                   r"\w+\s+\d{1,2},\s+\d{4}|\d{1,2}\s+\w+\s+\d{4}|\d{1,2}\s+\w+\s+\d{2}|" \
-                   r"\w+\s+\d{1,2}|\d{1,2}\s*[ -]\s*\d{1,2})"
 
-    # Construct regex pattern and find matches
-    pattern = rf"({closing_keywords_pattern})[\s:]*({date_formats})"
-    matches = re.findall(pattern, text, re.IGNORECASE)
-    dates = [(match[1], match[0]) for match in matches]  # Store date and corresponding keyword
-    return dates
+def find_closing_date(text: str, db_connection=None, closing_keywords=None):
+    """
+    Returns the first closing date in the text that parses, without looking any further.
+
+    Args:
+        text (str): The text to search for closing dates.
+        db_connection: Optional database connection, only used when the keyword registry needs to reload.
+        closing_keywords (KeywordSet): Keywords to use instead of the registry's.
+
+    Returns:
+        tuple: (closing_date, date, keyword) with the parsed datetime.date, or None if no usable date is found.
+    """
+    for date, keyword in iter_closing_dates(text, db_connection, closing_keywords):
+        closing_date = parse_date(date)
+        if closing_date:
+            return closing_date, date, keyword
+        logging.debug(f"Skipping unparseable closing date candidate: {date}")
+    return None
 
 
 def clean_date_string(date_str: str) -> str:
@@ -129,20 +180,14 @@ def clean_date_string(date_str: str) -> str:
     Returns:
         str: A cleaned date string.
     """
-    # Remove suffixes like "st", "nd", "rd", "th"
-    date_str = re.sub(r'\b(\d+)(st|nd|rd|th)\b', r'\1', date_str)
-    # Remove day names (e.g., "Monday")
-    date_str = re.sub(r'(?i)(monday|tuesday|wednesday|thursday|friday|saturday|sunday)', '', date_str)
-    # Normalize whitespace
-    date_str = ' '.join(date_str.split())
-    return date_str
+    return normalize_date_string(date_str)
 
 def parse_closing_date(date: str) -> datetime.date:
     """
-    Parses a cleaned date string into a datetime.date object.
+    Parses a date string into a datetime.date object using the shared date parser.
     
     Args:
-        date (str): The cleaned date string to parse.
+        date (str): The date string to parse.
     
     Returns:
         datetime.date: A date object representing the parsed date.
@@ -150,37 +195,12 @@ def parse_closing_date(date: str) -> datetime.date:
     Raises:
         ValueError: If the date cannot be parsed into a known format.
     """
-    cleaned_date = clean_date_string(date)
-
-    # Define the possible date formats
-    formats = [
-        "%d %B %Y", "%d %b %Y", "%d %m %Y", "%d/%m/%Y",
-        "%Y-%m-%d", "%B %d, %Y", "%d %B %y", "%d-%m-%Y",
-        "%d %B", "%B %d", "%I:%M %p on %d %B %Y", "%d %B %Y %I:%M %p",
-        "%d-%m-%y", "%m/%d/%Y", "%m-%d-%Y", "%m/%d/%y", "%m-%d-%y",
-        "%B %d %Y", "%B %d", "%d %b"
-    ]
-
-    # Try each format to parse the date
-    for fmt in formats:
-        try:
-            return datetime.strptime(cleaned_date, fmt).date()
-        except ValueError:
-            continue  # Try the next format if this fails
-
-    # Special handling for ambiguous month/day cases
-    if " " in cleaned_date:
-        month_day = cleaned_date.split(" ")
-        if len(month_day) == 2:
-            current_year = datetime.now().year
-            try:
-                return datetime.strptime(f"{month_day[1]} {month_day[0]} {current_year}", "%d %b %Y").date()
-            except ValueError:
-                pass  # Skip if this format fails
-
-    # Log the error if no formats matched
-    logging.error(f"Unable to parse date: {cleaned_date}")
-    raise ValueError(f"Unable to parse date: {cleaned_date}")
+    parsed_date = parse_date(date)
+    if parsed_date is None:
+        # Log the error if no formats matched
+        logging.error(f"Unable to parse date: {clean_date_string(date)}")
+        raise ValueError(f"Unable to parse date: {clean_date_string(date)}")
+    return parsed_date
 
 def is_valid_url(url: str, base_url: str) -> str:
     """
@@ -239,7 +259,7 @@ def construct_search_url(search_engine: str, query: str) -> str:
         "Google": "https://www.google.com/search?q=",
         "Bing": "https://www.bing.com/search?q=",
         "Yahoo": "https://search.yahoo.com/search?p=",
-        "DuckDuckGo": "https://duckduckgo.com/?q=",
+        "DuckDuckGo": "https://html.duckduckgo.com/html/?q=",  # The JS-free page has the results in its HTML
         "Ask": "https://www.ask.com/web?q="
     }
 
@@ -250,39 +270,209 @@ def construct_search_url(search_engine: str, query: str) -> str:
     logging.error(f"Search engine '{search_engine}' not supported.")
     return None
 
-def extract_pdf_text(pdf_content: bytes) -> str:
+# Default reading budget for scraped PDFs; deadlines sit on the first pages of a tender document
+PDF_MAX_PAGES = 30
+PDF_MAX_CHARS = 300000
+
+
+def iter_pdf_pages(pdf_content, max_pages: int = None, max_chars: int = None):
+    """
+    Yields the text of a PDF one page at a time.
+
+    Pages without any fonts (scanned, image-only pages) are skipped without
+    running text extraction on them.
+
+    Args:
+        pdf_content (bytes or str): The PDF file content as bytes, or the path of a PDF on disk.
+        max_pages (int): Stop after this many pages, or None for no limit.
+        max_chars (int): Stop once this many characters have been yielded, or None for no limit.
+
+    Yields:
+        str: The text of each page that has any.
+    """
+    chars_read = 0
+    # Opening a path lets PyMuPDF read the file from disk instead of holding it in memory
+    if isinstance(pdf_content, str):
+        pdf_document = fitz.open(pdf_content, filetype="pdf")
+    else:
+        pdf_document = fitz.open(stream=pdf_content, filetype="pdf")
+    with pdf_document:
+        for page_number, page in enumerate(pdf_document):
+            if max_pages is not None and page_number >= max_pages:
+                break
+
+            # A page with no fonts cannot contain extractable text
+            if not page.get_fonts():
+                continue
+
+            text = page.get_text()
+            if max_chars is not None:
+                text = text[:max_chars - chars_read]
+            if text:
+                chars_read += len(text)
+                yield text
+            if max_chars is not None and chars_read >= max_chars:
+                break
+
+
+def extract_pdf_text(pdf_content, max_pages: int = None, max_chars: int = None) -> str:
     """
     Extracts text from the provided PDF content.
     
     Args:
-        pdf_content (bytes): The PDF file content as bytes.
+        pdf_content (bytes or str): The PDF file content as bytes, or the path of a PDF on disk.
+        max_pages (int): Only read this many pages, or None for the whole document.
+        max_chars (int): Only read this many characters, or None for the whole document.
     
     Returns:
         str: The extracted text from the PDF.
     """
-    # Open the PDF using PyMuPDF and extract text from each page
-    pdf_document = fitz.open(stream=pdf_content, filetype="pdf")
-    text = ""
-    for page in pdf_document:
-        text += page.get_text()
-    pdf_document.close()  # Clean up
-    return text
+    return "".join(iter_pdf_pages(pdf_content, max_pages, max_chars))
+
+
+def read_pdf_until_closing_date(pdf_content, db_connection=None, closing_keywords=None,
+                                max_pages: int = PDF_MAX_PAGES, max_chars: int = PDF_MAX_CHARS):
+    """
+    Reads a PDF page by page and stops at the first page that yields a usable closing date.
 
-def extract_docx_text(docx_content: bytes) -> str:
+    Args:
+        pdf_content (bytes or str): The PDF file content as bytes, or the path of a PDF on disk.
+        db_connection: Optional database connection, only used when the keyword registry needs to reload.
+        closing_keywords (KeywordSet): Keywords to use instead of the registry's, e.g. in extraction workers.
+        max_pages (int): Page budget.
+        max_chars (int): Character budget.
+
+    Returns:
+        tuple: (text, closing_date_match) with the text read so far and the
+        find_closing_date result, which is None if no date was found within the budget.
+    """
+    pages = []
+    carry = ""  # End of the previous page, so a keyword and date split across pages still match
+    for page_text in iter_pdf_pages(pdf_content, max_pages, max_chars):
+        pages.append(page_text)
+        closing_date_match = find_closing_date(carry + page_text, db_connection, closing_keywords)
+        if closing_date_match:
+            return "".join(pages), closing_date_match
+        carry = page_text[-CLOSING_DATE_WINDOW:]
+    return "".join(pages), None
+
+
+def extract_docx_text(docx_content) -> str:
     """
     Extracts text from the provided DOCX content.
     
     Args:
-        docx_content (bytes): The DOCX file content as bytes.
+        docx_content (bytes or str): The DOCX file content as bytes, or the path of a DOCX on disk.
     
     Returns:
         str: The extracted text from the DOCX file.
     """
+    if isinstance(docx_content, str):
+        doc = Document(docx_content)  # Load the DOCX file from disk
+        return "\n".join([paragraph.text for paragraph in doc.paragraphs])
+
     with BytesIO(docx_content) as f:
         doc = Document(f)  # Load the DOCX file
         # Join all paragraph texts into a single string
         return "\n".join([paragraph.text for paragraph in doc.paragraphs])
 
+# Detail pages are fed to the parser in chunks so parsing can stop once the title and description are known
+HTML_PARSE_CHUNK = 16 * 1024
+HTML_DESCRIPTION_PARAGRAPHS = 2
+HTML_DETAIL_TAGS = ('h1', 'h2', 'p')
+
+_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=', re.IGNORECASE)
+
+
+def _iter_html_chunks(html_content):
+    if isinstance(html_content, str):
+        with open(html_content, 'rb') as f:
+            for chunk in iter(lambda: f.read(HTML_PARSE_CHUNK), b''):
+                yield chunk
+    else:
+        for start in range(0, len(html_content), HTML_PARSE_CHUNK):
+            yield html_content[start:start + HTML_PARSE_CHUNK]
+
+
+def _html_encoding(head: bytes, content_type: str):
+    """Charset to decode a page with: the Content-Type charset, else None to let lxml read a <meta> tag, else UTF-8."""
+    for param in (content_type or '').split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset' and value.strip():
+            return value.strip().strip('"\'')
+    return None if _CHARSET_RE.search(head) else 'utf-8'
+
+
+def _iter_html_elements(html_content, content_type: str = None):
+    """Yields the elements of a page as they close, discarding each one once the caller has read it."""
+    parser = None
+    for chunk in _iter_html_chunks(html_content):
+        if parser is None:
+            parser = etree.HTMLPullParser(events=('end',), encoding=_html_encoding(chunk, content_type))
+        parser.feed(chunk)
+        yield from _drain_html_events(parser)
+
+    if parser is not None:
+        try:
+            parser.close()
+        except etree.LxmlError:
+            pass  # Truncated or broken markup; keep what was parsed
+        yield from _drain_html_events(parser)
+
+
+def _drain_html_events(parser):
+    for _, element in parser.read_events():
+        yield element
+        if next(element.iterancestors(*HTML_DETAIL_TAGS), None) is not None:
+            continue  # Still needed for the text of the heading or paragraph around it
+        # Drop what has been read so the tree never holds more than the open elements
+        element.clear()
+        parent = element.getparent()
+        while parent is not None and element.getprevious() is not None:
+            del parent[0]
+
+
+def extract_html_details(html_content, fallback_title: str, content_type: str = None,
+                         max_paragraphs: int = HTML_DESCRIPTION_PARAGRAPHS) -> tuple:
+    """
+    Reads the title and leading paragraphs of a tender detail page.
+
+    The page is fed to lxml's pull parser chunk by chunk. Only <h1>, <h2> and
+    <p> elements are read, every other element is discarded once it closes, and
+    parsing stops as soon as an <h1> and enough paragraphs have been seen, so
+    heavy pages are neither fully parsed nor held as a tree in memory.
+
+    Args:
+        html_content (bytes or str): The page as bytes, or the path of a spooled page on disk.
+        fallback_title (str): Title to use when the page has neither an <h1> nor an <h2>.
+        content_type (str): The Content-Type response header, for its charset.
+        max_paragraphs (int): Number of paragraphs that make up the description.
+
+    Returns:
+        tuple: (title, description) with the first <h1> (else the first <h2>) and the
+        first paragraphs joined by spaces.
+    """
+    h1_text = h2_text = None
+    paragraphs = []
+
+    for element in _iter_html_elements(html_content, content_type):
+        tag = element.tag
+        if tag == 'h1' and h1_text is None:
+            h1_text = "".join(element.itertext()).strip()
+        elif tag == 'h2' and h2_text is None:
+            h2_text = "".join(element.itertext()).strip()
+        elif tag == 'p' and len(paragraphs) < max_paragraphs:
+            paragraphs.append("".join(element.itertext()).strip())
+        else:
+            continue
+
+        if h1_text is not None and len(paragraphs) >= max_paragraphs:
+            break  # Nothing later in the page can change the result
+
+    title = h1_text if h1_text is not None else h2_text if h2_text is not None else fallback_title
+    return title, " ".join(paragraphs)
+
+
 def extract_description_from_response(response, format_type: str) -> str:
     """
     Extracts a description from the HTTP response based on the content format.
@@ -295,8 +485,8 @@ def extract_description_from_response(response, format_type: str) -> str:
         str: A description extracted from the content, or an empty string if not found.
     """
     if format_type == 'PDF':
-        # For PDF, extract text and return the first line as the description
-        pdf_text = extract_pdf_text(response.content)
+        # For PDF, only the first page with text is needed for its first line
+        pdf_text = next(iter_pdf_pages(response.content), "")
         return pdf_text.split('\n')[0] if pdf_text else ""
     else:  # For HTML or other formats
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -309,79 +499,3 @@ def extract_description_from_response(response, format_type: str) -> str:
         # Fallback: return the text of the first paragraph in the content
         paragraphs = soup.find_all('p')
         return paragraphs[0].text if paragraphs else ""
-
-def insert_tender_to_db(tender_info: dict, db_connection) -> bool:
-    """
-    Inserts or updates the tender information in the database.
-    
-    Args:
-        tender_info (dict): A dictionary containing all relevant information about the tender.
-        db_connection: The active database connection object.
-    
-    Returns:
-        bool: True if the operation was successful, False otherwise.
-    """
-    # Ensure the database connection is active
-    if db_connection is None:
-        logging.error("Database connection is not active.")
-        return False  # Return false if the connection is invalid
-
-    cur = db_connection.cursor()  # Create a cursor for database operations
-    current_date = datetime.now().date()  # Get today's date
-    # Determine the status of the tender based on its closing date
-    tender_info['status'] = 'open' if tender_info['closing_date'] > current_date else 'closed'
-
-    # SQL query to check for existing records
-    check_sql = """
-        SELECT * FROM tenders 
-        WHERE source_url = %s OR title = %s
-    """
-    params_check = (tender_info['source_url'], tender_info['title'])
-
-    try:
-        # Execute the check for existing tender records
-        cur.execute(check_sql, params_check)
-        existing_tender = cur.fetchone()
-
-        if existing_tender:
-            # Log a warning if a duplicate tender is found
-            logging.warning(f"Duplicate found for Source URL: {tender_info['source_url']} or Title: {tender_info['title']}. Overwriting the record in the database.")
-
-        # SQL statement to insert or update the tender record
-        insert_sql = """
-            INSERT INTO tenders (title, description, closing_date, source_url, status, scraped_at, format, tender_type)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (source_url) DO UPDATE
-            SET closing_date = EXCLUDED.closing_date,
-                status = EXCLUDED.status,
-                description = EXCLUDED.description,
-                scraped_at = EXCLUDED.scraped_at,
-                format = EXCLUDED.format,
-                tender_type = EXCLUDED.tender_type
-        """
-
-        params = (
-            tender_info['title'],
-            tender_info.get('description', ''),
-            tender_info['closing_date'],
-            tender_info['source_url'],
-            tender_info['status'],
-            tender_info['scraped_at'],
-            tender_info['format'],
-            tender_info['tender_type']
-        )
-
-        logging.debug(f"Executing SQL: {insert_sql}")
-        logging.debug(f"With parameters: {params}")
-
-        # Execute the insert/update operation
-        cur.execute(insert_sql, params)
-        db_connection.commit()  # Commit the transaction
-        logging.info(f"Successfully inserted/updated tender: {tender_info['title']}")
-        return True  # Indicate success
-    except Exception as e:
-        db_connection.rollback()  # Roll back if there was an error
-        logging.error(f"Error inserting/updating tender: {str(e)}")
-        return False  # Indicate failure
-    finally:
-        cur.close()  # Always ensure the cursor is closed to free up resources
\ No newline at end of file
@@ -9,6 +9,22 @@ import datetime
 
 tenders_bp = Blueprint('tenders', __name__)
 
+
+def _tender_to_dict(tender):
+    """Converts one row of the /api/tenders query into its JSON form."""
+    return {
+        "id": tender[0],
+        "title": tender[1],
+        "description": tender[2] if tender[2] is not None else "No description",
+        "closing_date": tender[3],
+        "status": tender[4].capitalize(),
+        "source_url": tender[5],
+        "format": tender[6],
+        "tender_type": tender[7],
+        "scraped_at": tender[8]
+    }
+
+
 # Unified tender fetching route
 @tenders_bp.route('/api/tenders', methods=['GET', 'POST'])
 @jwt_required()
@@ -37,8 +53,8 @@ def get_tenders():
                         # Using a single query to optimize database calls
                         cur.execute("""
                             SELECT
-                                SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END) AS open_count,
-                                SUM(CASE WHEN status = 'closed' THEN 1 ELSE 0 END) AS closed_count
+                                COUNT(*) FILTER (WHERE status = 'open') AS open_count,
+                                COUNT(*) FILTER (WHERE status = 'closed') AS closed_count
                             FROM tenders
                             WHERE tender_type = 'Uploaded Websites'
                         """)
@@ -61,37 +77,27 @@ def get_tenders():
                     query = """
                         SELECT id, title, description, closing_date, status, source_url, format, tender_type, scraped_at
                         FROM tenders
+                        WHERE status = %s
                     """
                     query_params = []
 
                     if start_date and end_date:
-                        query += " WHERE closing_date BETWEEN %s AND %s"
+                        query += " AND closing_date BETWEEN %s AND %s"
                         query_params.extend([start_date, end_date])
                         logging.info(f"Filtering tenders by Date Range: {start_date} to {end_date}")
 
-                    cur.execute(query, query_params)
-                    tenders = cur.fetchall()
-
-                # Transform fetched tenders into a list of dictionaries
-                tenders_list = [{
-                    "id": tender[0],
-                    "title": tender[1],
-                    "description": tender[2] if tender[2] is not None else "No description",
-                    "closing_date": tender[3],
-                    "status": tender[4].capitalize(),
-                    "source_url": tender[5],
-                    "format": tender[6],
-                    "tender_type": tender[7],
-                    "scraped_at": tender[8]
-                } for tender in tenders]
-
-                open_tenders = [tender for tender in tenders_list if tender["status"].lower() == "open"]
-                closed_tenders = [tender for tender in tenders_list if tender["status"].lower() == "closed"]
+                    # One query per status, so the split is done by the database rather than row by row here
+                    tenders_by_status = {}
+                    for status in ('open', 'closed'):
+                        cur.execute(query, [status] + query_params)
+                        tenders_by_status[status] = [_tender_to_dict(tender) for tender in cur.fetchall()]
+
+                open_tenders, closed_tenders = tenders_by_status['open'], tenders_by_status['closed']
 
                 return jsonify({
                     "open_tenders": open_tenders,
                     "closed_tenders": closed_tenders,
-                    "total_tenders": len(tenders_list),
+                    "total_tenders": len(open_tenders) + len(closed_tenders),
                     "month_names": ["January", "February", "March", "April", "May", "June", "July", "August", "September",
                                     "October", "November", "December"]
                 }), 200
@@ -9,6 +9,7 @@ from webapp.db.db import (
     rename_directory_keyword
 )
 from webapp.cache.redis_cache import get_cache, set_cache, delete_cache
+from webapp.cache.keyword_registry import keyword_registry
 
 directory_keywords_bp = Blueprint('directory_keywords_bp', __name__)
 
@@ -96,6 +97,7 @@ def add_keyword():
 
         # Invalidate the existing cache
         delete_cache(CACHE_KEY_TEMPLATE.format(new_keyword))  # Adjusting cache key if needed according to the new keyword
+        keyword_registry.invalidate()  # Scrapers in every worker reload their compiled keywords
         logging.info(f"Keyword '{new_keyword}' with tender type '{tender_type}' added and cache invalidated.")
 
         return jsonify({"message": "Keyword added successfully"}), 201
@@ -138,6 +140,7 @@ def remove_keyword(keyword):
 
         # Commit the transaction
         db_connection.commit()
+        keyword_registry.invalidate()  # Only after commit, so other workers reload the new state
 
         return jsonify({"message": "Keyword removed successfully"}), 200
 
@@ -201,6 +204,7 @@ def rename_keyword():
         # Invalidate the existing cache
         delete_cache(CACHE_KEY_TEMPLATE.format(old_keyword))  # Invalidate cache for the old keyword
         delete_cache(CACHE_KEY_TEMPLATE.format(new_keyword))  # Cache for the new keyword if needed
+        keyword_registry.invalidate()  # Scrapers in every worker reload their compiled keywords
         logging.info(f"Keyword '{old_keyword}' renamed to '{new_keyword}' and cache invalidated.")
 
         return jsonify({"message": f"Keyword renamed from '{old_keyword}' to '{new_keyword}' successfully."}), 200
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import functools
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from webapp.config.config import CRAWL_CONCURRENCY, CRAWL_PER_HOST_CONCURRENCY
+from webapp.utils.rate_limiter import host_of
+
+
+class CrawlEngine:
+    """
+    Visits search-result links concurrently with an asyncio scheduler.
+
+    Each link is a task whose visit function (e.g. scrape_tender_details) runs
+    in a worker thread, so the existing fetch, extraction and relevance code is
+    reused as is. At most `concurrency` links are in flight overall and at most
+    `per_host_concurrency` per host; a task waiting for a busy host does not
+    hold a global slot, so other hosts keep going. Spacing between requests to
+    one host is still enforced by the shared rate limiter in http_client.
+
+    Visits are not given a database connection: pg8000 connections must not be
+    shared between threads, and holding a pooled one for a whole fetch would let
+    a few concurrent scans exhaust the pool. The DB helpers the visit calls check
+    a connection out of the pool only around their own statements.
+
+    Args:
+        concurrency (int): Links visited at the same time.
+        per_host_concurrency (int): Links visited at the same time on one host.
+
+    Usage:
+        results = crawl_engine.crawl([(url, title, headers), ...], scrape_tender_details)
+    """
+
+    def __init__(self, concurrency=CRAWL_CONCURRENCY, per_host_concurrency=CRAWL_PER_HOST_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+
+    def crawl(self, tasks, visit, on_result=None):
+        """
+        Runs visit(*task) for every task, concurrently.
+
+        Args:
+            tasks (iterable): Tuples whose first item is the URL, passed to visit as positional arguments.
+            visit (callable): Blocking function that visits one URL.
+            on_result (callable): Called with each visit result as soon as it is ready, in completion
+                order and in the calling thread, e.g. to update running totals.
+
+        Returns:
+            list: The visit results in task order; None for visits that raised.
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return []
+        return asyncio.run(self._crawl(tasks, visit, on_result))
+
+    async def _crawl(self, tasks, visit, on_result):
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        host_slots = defaultdict(lambda: asyncio.Semaphore(self.per_host_concurrency))
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawl') as executor:
+            async def run_task(task):
+                url = task[0]
+                # Wait for the host first, so a busy host does not tie up a global slot
+                async with host_slots[host_of(url)]:
+                    async with slots:
+                        try:
+                            result = await loop.run_in_executor(executor, functools.partial(visit, *task))
+                        except Exception as e:
+                            logging.error(f"Error visiting {url}: {str(e)}")
+                            return None
+
+                if on_result is not None:
+                    try:
+                        on_result(result)
+                    except Exception as e:
+                        logging.error(f"Error handling the result of {url}: {str(e)}")
+                return result
+
+            results = await asyncio.gather(*(run_task(task) for task in tasks))
+
+        logging.info(f"Crawled {len(tasks)} links with up to {self.concurrency} at a time.")
+        return results
+
+
+# Shared engine used by the search-engine scrapers
+crawl_engine = CrawlEngine()
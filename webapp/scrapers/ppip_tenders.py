@@ -1,4 +1,3 @@
-import re
 import time
 from datetime import datetime
 from bs4 import BeautifulSoup
@@ -9,8 +8,9 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
 from webapp.config import get_db_connection
-from webapp.routes.tenders.tender_utils import insert_tender_to_db
+from webapp.db import upsert_tenders
 from webapp.db.db import get_directory_keywords
+from webapp.utils.date_parser import parse_datetime
 import logging
 
 # Configure Python logging
@@ -30,33 +30,10 @@ def get_format(url):
 
 def parse_date(date_str):
     """Parse date from string and return a datetime object."""
-    try:
-        # Remove ordinal suffixes and extra spaces/characters
-        date_str = re.sub(r'(\d+)(st|nd|rd|th)', r'\1', date_str).strip()
-
-        # Attempt to parse with various date formats
-        formats = [
-            "%B %d, %Y",         # e.g., January 7, 2025
-            "%B %d %Y",          # e.g., January 7 2025
-            "%d %B, %Y",         # e.g., 7 January, 2025
-            "%d %B %Y",          # e.g., 7 January 2025
-            "%B %d %Y %H:%M",    # e.g., January 7 2025 09:00
-            "%d %B %Y %H:%M",    # e.g., 7 January 2025 09:00
-            "%b %d %Y %H:%M",    # e.g., Jan 9 2025 11:00
-            "%b %d, %Y",         # e.g., Jan 9, 2025
-            "%b %d %Y"           # e.g., Jan 9 2025
-        ]
-
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)  # Return datetime object
-            except ValueError:
-                continue
-
-        raise ValueError("Date format not recognized")
-    except Exception as e:
-        logger.error(f"Error parsing date '{date_str}': {e}")
-        return None
+    closing_datetime = parse_datetime(date_str)
+    if closing_datetime is None:
+        logger.error(f"Error parsing date '{date_str}': Date format not recognized")
+    return closing_datetime
 
 def ensure_db_connection():
     try:
@@ -197,6 +174,7 @@ def scrape_ppip_tenders():
                 continue
 
             # Process each tender
+            tender_batch = []  # Open tenders for this keyword, saved in one batched upsert
             for tender in tenders:
                 # Ensure the tender row has enough cells
                 cells = tender.find_all('td')
@@ -253,30 +231,30 @@ def scrape_ppip_tenders():
                         closing_date_datetime = parse_date(closing_date)
                         public_link = modal_element.find_element(By.XPATH, "//span[text()='Public Link']/following-sibling::span/a").get_attribute('href')
 
-                        status = 'Open' if closing_date_datetime > datetime.now() else 'Closed'
-
                         tender_data = {
                             'title': description,
                             'description': tender_number,
                             'closing_date': closing_date_datetime.date() if closing_date_datetime else None,
                             'source_url': public_link,
-                            'status': status,
                             'format': 'HTML',
                             'scraped_at': datetime.now().date(),
                             'tender_type': "PPIP",
                         }
 
-                        # Inserting tender into DB
-                        try:
-                            db_connection.cursor().execute("SELECT 1")  # Check DB connection
-                            insert_tender_to_db(tender_data, db_connection)
-                            logger.info(f"Inserted tender: {modal_title} | Source URL: {public_link}")
-                        except Exception as e:
-                            logger.error(f"Error inserting tender '{modal_title}' into database: {e}")
+                        tender_batch.append(tender_data)
+                        logger.info(f"Queued tender: {modal_title} | Source URL: {public_link}")
 
                     except Exception as e:
                         logger.error(f"Error processing action for tender '{title}': {str(e)}")
 
+            if tender_batch:
+                try:
+                    counts = upsert_tenders(tender_batch, db_connection)
+                    logger.info(f"Tenders saved for '{search_keyword}': {counts['inserted']} inserted, "
+                                f"{counts['updated']} updated, {counts['unchanged']} unchanged, {counts['failed']} failed.")
+                except Exception as e:
+                    logger.error(f"Error inserting tenders for '{search_keyword}' into database: {e}")
+
         logger.info("Scraping completed.")
 
     except Exception as e:
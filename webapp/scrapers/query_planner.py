@@ -0,0 +1,100 @@
+from urllib.parse import urlparse
+from webapp.config.config import GOOGLE_MAX_QUERY_WORDS
+from webapp.utils.rate_limiter import host_of
+
+
+def site_target(website):
+    """
+    The site: operand for an uploaded website, e.g. 'example.org/tenders' for 'https://example.org/tenders/'.
+
+    Returns:
+        str: The host (and path, if any) without scheme or trailing slash, or '' if there is none.
+    """
+    website = website.strip()
+    if '//' in website:
+        website = website.split('//', 1)[1]
+    return website.rstrip('/').lower()
+
+
+def query_words(query):
+    """Number of words a search engine counts in a query; operators and quoted words count too."""
+    return len(query.split())
+
+
+class SiteQuery:
+    """
+    One search query plus the uploaded websites its site: operators cover.
+
+    Args:
+        query (str): The query text, including any engine URL parameters.
+        websites (sequence): The uploaded websites the query is restricted to; empty for unrestricted queries.
+
+    Usage:
+        for site_query in plan_site_queries(websites, '"tender" OR "rfp"'):
+            ...
+            website = site_query.source_of(result_url)
+    """
+
+    def __init__(self, query, websites=()):
+        self.query = query
+        self.websites = list(websites)
+        self._targets = [(website, site_target(website)) for website in self.websites]
+
+    def source_of(self, url):
+        """
+        Attributes a result URL to the uploaded website whose site: operator matched it.
+
+        Returns:
+            str: The uploaded website, or None if the URL is on none of them.
+        """
+        host = host_of(url)
+        path = urlparse(url).path.lstrip('/').lower()
+        for website, target in self._targets:
+            target_host, _, target_path = target.partition('/')
+            # site:example.org also matches its subdomains, and site:example.org/tenders only that path
+            # and the pages below it, not e.g. /tenders-archive
+            if not (host == target_host or host.endswith('.' + target_host)):
+                continue
+            if not target_path or path.rstrip('/') == target_path or path.startswith(target_path + '/'):
+                return website
+        return None
+
+    def __str__(self):
+        return self.query
+
+
+def plan_site_queries(websites, clause, suffix='', max_words=GOOGLE_MAX_QUERY_WORDS):
+    """
+    Packs the site: operators of many websites into as few queries as the engine's word limit allows.
+
+    Each query reads "(site:a OR site:b ...) <clause><suffix>", so one search
+    covers a batch of websites instead of one. A website whose clause alone
+    exceeds the limit still gets a query of its own.
+
+    Args:
+        websites (iterable): Uploaded website URLs.
+        clause (str): The search terms, e.g. '"tender" OR "rfp" 2024'.
+        suffix (str): Engine URL parameters appended verbatim, e.g. '&as_qdr=y'; not counted as words.
+        max_words (int): Words the engine reads per query.
+
+    Returns:
+        list: SiteQuery objects, in website order.
+    """
+    targets = {}
+    for website in websites:
+        target = site_target(website)
+        if target and target not in targets:
+            targets[target] = website
+
+    # n sites take 2n - 1 words: each site: operator plus the ORs between them
+    budget = max_words - query_words(clause)
+    per_query = max(1, (budget + 1) // 2)
+
+    items = list(targets.items())
+    site_queries = []
+    for start in range(0, len(items), per_query):
+        batch = items[start:start + per_query]
+        sites = " OR ".join(f"site:{target}" for target, _ in batch)
+        group = f"({sites})" if len(batch) > 1 else sites
+        site_queries.append(SiteQuery(f"{group} {clause}{suffix}", [website for _, website in batch]))
+    return site_queries
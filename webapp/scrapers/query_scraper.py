@@ -1,8 +1,10 @@
 from webapp.config import get_db_connection  # Import function to establish database connection
 from webapp.scrapers.run_query_scraper import scrape_tenders  # Import the function used for scraping tenders
+from webapp.scrapers.url_frontier import UrlFrontier  # Run-wide de-duplication of result links
 from datetime import datetime  # For handling date and time
 from webapp.services.log import ScrapingLog  # Import your custom logging class
 from webapp.scrapers.scraper_status import scraping_status  # Import the global scraping status
+from webapp.db.log_writer import scraping_log_writer  # Buffered scraping_log writes
 
 
 def fetch_terms(db_connection):
@@ -126,10 +128,11 @@ def scrape_tenders_from_query(selected_engines=None, time_frame=None, file_type=
             all_queries.extend(ask_queries)
 
             # Perform scraping for each query
+        frontier = UrlFrontier()  # Shared by all queries, so each result link is visited once per run
         for query in all_queries:
             ScrapingLog.add_log(f"Scraping for query: {query}")
             try:
-                scraped_tenders = scrape_tenders(db_connection, query, selected_engines)
+                scraped_tenders = scrape_tenders(db_connection, query, selected_engines, frontier=frontier)
 
                 if scraped_tenders is not None:
                     total_found_tenders += len(scraped_tenders)
@@ -172,6 +175,7 @@ def scrape_tenders_from_query(selected_engines=None, time_frame=None, file_type=
         ScrapingLog.add_log(f"An error occurred while scraping: {e}")
 
     finally:
+        scraping_log_writer.flush()  # Make this run's page logs visible once the scan ends
         if db_connection is not None:
             db_connection.close()
             ScrapingLog.add_log("Database connection closed.")
@@ -4,8 +4,9 @@ import time
 import urllib.parse
 from datetime import datetime
 from webapp.config import get_db_connection
-from webapp.routes.tenders.tender_utils import insert_tender_to_db
+from webapp.db import upsert_tenders
 from webapp.db.db import get_directory_keywords
+from webapp.utils.http_client import http_client
 
 
 def get_format(url):
@@ -38,7 +39,6 @@ def ensure_db_connection():
 def fetch_reliefweb_tenders():
     """Fetches tenders from the ReliefWeb API and inserts them into the database."""
     base_api_url = "https://api.reliefweb.int/v1/jobs?appname=gcg-tender&profile=list&preset=latest&slim=1"
-    session = requests.Session()  # Use a session for persistent connections
 
     retry_attempts = 3
     for attempt in range(retry_attempts):
@@ -74,20 +74,17 @@ def fetch_reliefweb_tenders():
             encoded_query_value = urllib.parse.quote(query_value)
             api_url = f"{base_api_url}&query%5Bvalue%5D={encoded_query_value}&query%5Boperator%5D=AND"
 
-            # Fetch data from the ReliefWeb API with retry logic
+            # Fetch data from the ReliefWeb API; the shared client retries 429/5xx and connection errors
             response = None
-            for _ in range(3):  # Retry up to 3 times with increasing backoff
-                try:
-                    logging.info(f"Sending API request.")
-                    response = session.get(api_url, timeout=10)  # Set a timeout of 10 seconds
-                    if response.status_code == 200:
-                        logging.info(f"API request successful: {response.status_code}")
-                        break
-                    else:
-                        logging.error(f"Failed to fetch tenders, status code: {response.status_code}")
-                except requests.RequestException as e:
-                    logging.error(f"Request error: {str(e)}")
-                time.sleep(2 ** _)  # Exponential backoff (1s, 2s, 4s, ...)
+            try:
+                logging.info(f"Sending API request.")
+                response = http_client.get(api_url, timeout=10)  # Set a timeout of 10 seconds
+                if response.status_code == 200:
+                    logging.info(f"API request successful: {response.status_code}")
+                else:
+                    logging.error(f"Failed to fetch tenders, status code: {response.status_code}")
+            except requests.RequestException as e:
+                logging.error(f"Request error: {str(e)}")
 
             if response is None or response.status_code != 200:
                 logging.error("Failed to fetch tenders after multiple attempts.")
@@ -103,14 +100,13 @@ def fetch_reliefweb_tenders():
                 logging.error("Failed to establish a database connection for insertion.")
                 return []
 
-            # Process and insert tenders into the database
+            # Process the tenders, they are inserted into the database in one batch below
             for job in data['data']:
                 title = job['fields']['title']
                 closing_date = job['fields']['date'].get('closing') if 'date' in job['fields'] else None
 
                 if closing_date:
                     closing_date_obj = datetime.strptime(closing_date, "%Y-%m-%dT%H:%M:%S%z").date()
-                    status = "open" if closing_date_obj > datetime.now().date() else "closed"
                     organization = job['fields']['source'][0]['name'] if job['fields'].get('source') else 'Unknown'
 
                     # Prepare the tender info
@@ -121,7 +117,6 @@ def fetch_reliefweb_tenders():
                         'title': title,
                         'closing_date': closing_date_obj,
                         'source_url': source_url,
-                        'status': status,
                         'format': format_type,
                         'description': organization,
                         'scraped_at': datetime.now(),
@@ -129,28 +124,21 @@ def fetch_reliefweb_tenders():
                     }
                     tenders.append(tender_info)
 
-                    # Insert tender information into the database
-                    try:
-                        logging.info(f"Attempting to insert tender '{title}' into the database.")
-                        success = insert_tender_to_db(tender_info, db_connection)
-                        if success:
-                            logging.info(f"Inserted Tender: {tender_info['title']}")
-                        else:
-                            logging.error(f"Failed to insert Tender: {tender_info['title']}")
-                    except Exception as insert_error:
-                        logging.error(f"Error during inserting tender '{title}': {str(insert_error)}")
-
                 else:
                     logging.warning(f"Skipping job '{title}' due to missing closing date.")
 
+            # Insert all tenders into the database in batches
+            counts = upsert_tenders(tenders, db_connection)
+            logging.info(f"ReliefWeb tenders saved: {counts['inserted']} inserted, {counts['updated']} updated, "
+                         f"{counts['unchanged']} unchanged, {counts['failed']} failed.")
+            db_connection.close()  # Return the connection to the pool
+
             break  # Exit retry loop after successful execution
 
         except Exception as e:
             logging.error(f"An error occurred during attempt {attempt + 1}: {str(e)}")
             time.sleep(5)  # Exponential backoff on errors
 
-    session.close()  # Always close the session after the task
-
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)  # Set logging level
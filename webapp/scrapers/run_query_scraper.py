@@ -1,34 +1,26 @@
 from webapp.config import get_db_connection  # Import function to establish database connection
 import requests  # For making HTTP requests to scrape data
-from bs4 import BeautifulSoup  # For parsing HTML content
 from datetime import datetime  # For handling date and time
 from webapp.db import insert_tender_to_db, get_keywords_and_terms  # Import database utilities
 from webapp.routes.tenders.tender_utils import (
-    extract_closing_dates,
-    parse_closing_date,
-    get_format,
-    extract_pdf_text,
-    extract_docx_text,
+    find_closing_date,
+    extract_html_details,
     construct_search_url,
     extract_description_from_response,
     is_relevant_tender
 )
 from urllib.parse import urlparse  # Import this to parse URLs
-import urllib.parse  # Import this to parse URLs
-import random  # For generating random delays
-import time  # For adding sleep delays between requests
-import re  # For regular expression operations
 # from webapp.extensions import socketio  # Import your SocketIO instance here
 from webapp.services.log import ScrapingLog  # Import your custom logging class
-
-# List of common user agents to simulate different browsers
-USER_AGENTS = [
-    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36',
-    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15',
-    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:58.0) Gecko/20100101 Firefox/58.0',
-    'Mozilla/5.0 (Linux; Android 6.0; Nexus 6 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/56.0.2924.87 Mobile Safari/537.36',
-    'Mozilla/5.0 (iPhone; CPU iPhone OS 10_0 like Mac OS X) AppleWebKit/602.1.50 (KHTML, like Gecko) Version/10.0 Mobile/14E277 Safari/602.1',
-]
+from webapp.db.log_writer import scraping_log_writer  # Buffered scraping_log writes
+from webapp.services.extraction import extraction_service  # PDF/DOCX parsing off the GIL
+from webapp.utils.document_fetcher import fetch_document  # Streaming, size-capped downloads
+from webapp.db.document_cache import document_cache  # Extracted text of unchanged documents
+from webapp.utils.http_client import http_client, random_headers  # Pooled connections, retries and backoff
+from webapp.scrapers.crawl_engine import crawl_engine  # Concurrent result-link visits
+from webapp.scrapers.url_frontier import UrlFrontier  # Run-wide de-duplication of result links
+from webapp.db.recrawl_policy import recrawl_policy  # Skips links visited recently
+from webapp.scrapers.serp_parsers import parse_serp  # Organic results of each search engine
 
 # Mapping of supported search engines
 SEARCH_ENGINES = [
@@ -38,11 +30,8 @@ SEARCH_ENGINES = [
     "DuckDuckGo",
     "Ask"
 ]
-# Exponential backoff configuration
-MAX_RETRIES = 5
-BACKOFF_FACTOR = 2  # Experiment with this to suit your needs
 
-def scrape_tenders(db_connection, query, search_engines):
+def scrape_tenders(db_connection, query, search_engines, frontier=None):
     """
     Scrapes tenders from specified search engines using a constructed query.
 
@@ -50,11 +39,14 @@ def scrape_tenders(db_connection, query, search_engines):
         db_connection: The active database connection object.
         query (str): The constructed search query.
         search_engines (list): A list of selected search engines for scraping.
+        frontier (UrlFrontier): URLs already scheduled in this run; pass the same one for every
+            query of a run so a page found by several engines or queries is visited once.
 
     Returns:
         list: A list of tender information dictionaries scraped from the web.
     """
     tenders = []  # Initialize a list to hold scraped tender data
+    frontier = frontier if frontier is not None else UrlFrontier()
     excluded_domains = [
         "microsoft.com", "go.microsoft.com", "privacy.microsoft.com",
         "support.microsoft.com", "about.ads.microsoft.com",
@@ -72,83 +64,45 @@ def scrape_tenders(db_connection, query, search_engines):
         search_url = construct_search_url(engine, query)
         ScrapingLog.add_log(f"Constructed Search URL for engine '{engine}': {search_url}")
 
-        for attempt in range(MAX_RETRIES):
-            headers = {
-                "User-Agent": random.choice(USER_AGENTS),
-            }
-            time.sleep(random.uniform(3, 10))
-
-            try:
-                response = requests.get(search_url, headers=headers)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                links = soup.find_all('a', href=True)
-                for link in links:
-                    href = link['href']
-
-                    # Specific handling for Yahoo links
-                    if engine == "Yahoo" and 'url=' in href:
-                        actual_url = re.search(r'url=([^&]+)', href)
-                        if actual_url:
-                            actual_url = urllib.parse.unquote(actual_url.group(1))
-                        else:
-                            ScrapingLog.add_log(f"Skipping invalid URL: {href}")
-                            continue
-                    else:
-                        actual_url = extract_actual_link_from_search_result(href, engine)
-
-                    # Skip invalid URLs
-                    if not is_valid_url(href):
-                        # ScrapingLog.add_log(f"Skipping invalid URL: {href}")
-                        continue
-
-                    actual_url = extract_actual_link_from_search_result(href, engine)
-
-                    # Check against excluded domains
-                    if actual_url is None or is_excluded_domains(actual_url, excluded_domains):
-                        continue
-
-                    # Check if the actual URL is valid before visiting
-                    if is_valid_url(actual_url):
-                        ScrapingLog.add_log(f"Visiting URL: {actual_url}")
-                        tender_details = scrape_tender_details(actual_url, link.text.strip(), headers, db_connection)
-                        if tender_details:
-                            tenders.append(tender_details)
-
-                # Update progress
-                progress = ((i + 1) / total_steps) * 100
-                ScrapingLog.add_log(f'Emitting progress: {progress}%')
-
-            except requests.exceptions.HTTPError as http_err:
-                ScrapingLog.add_log(f"Error scraping {search_url}: {str(http_err)}")
-                if response.status_code == 429 and attempt < MAX_RETRIES - 1:
-                    wait_time = BACKOFF_FACTOR ** attempt
-                    ScrapingLog.add_log(f"429 Too Many Requests. Backing off for {wait_time} seconds.")
-                    time.sleep(wait_time)
+        headers = random_headers()  # One browser identity per engine, reused for the result pages
+
+        try:
+            # Spaced out per search engine by the rate limiter; 429/5xx are retried with jittered backoff
+            response = http_client.get(search_url, headers=headers)
+            response.raise_for_status()
+            # Only the organic results, with each engine's redirect wrapper already removed
+            visits = []  # (url, title, headers) of the result links to visit
+            for result in parse_serp(engine, response.content):
+                # Check against excluded domains
+                if is_excluded_domains(result.url, excluded_domains):
                     continue
-                else:
-                    break
+
+                url = frontier.admit(result.url)
+                if not url:
+                    continue  # Already scheduled by another engine or query
+                visits.append((url, result.title, headers))
+
+            # Leave out links whose last visit is still fresh, with one lookup for the whole page
+            due = recrawl_policy.due_urls([visit[0] for visit in visits], db_connection)
+            if len(due) < len(visits):
+                ScrapingLog.add_log(f"Skipping {len(visits) - len(due)} recently visited links.")
+                visits = [visit for visit in visits if visit[0] in due]
+
+            # Visit the links concurrently; DB lookups and writes borrow a pooled connection per statement
+            for tender_details in crawl_engine.crawl(visits, scrape_tender_details):
+                if tender_details:
+                    tenders.append(tender_details)
+
+            # Update progress
+            progress = ((i + 1) / total_steps) * 100
+            ScrapingLog.add_log(f'Emitting progress: {progress}%')
+
+        except requests.exceptions.RequestException as http_err:
+            ScrapingLog.add_log(f"Error scraping {search_url}: {str(http_err)}")
 
     ScrapingLog.add_log(f"Scraping completed. Total tenders found: {len(tenders)}")
     return tenders
 
-def extract_actual_link_from_search_result(href, engine):
-    if engine in ['Google', 'Bing', 'Yahoo', 'DuckDuckGo', 'Ask']:
-        if href.startswith('/'):
-            base_url = {
-                "Google": "https://www.google.com",
-                "Bing": "https://www.bing.com",
-                "Yahoo": "https://search.yahoo.com",
-                "DuckDuckGo": "https://duckduckgo.com",
-                "Ask": "https://www.ask.com"
-            }[engine]
-            return urllib.parse.urljoin(base_url, href)
-        match = re.search(r'q=([^&]+)', href)
-        if match:
-            return urllib.parse.unquote(match.group(1))
-    return href
-
 def is_valid_url(url):
     return url.startswith('http://') or url.startswith('https://')
 
@@ -173,49 +127,19 @@ def log_scraping_details(db_connection, website_name, visiting_url, tenders_foun
                          tender_title, closing_date, closing_keyword,
                          filtered_keyword, is_relevant, status):
     """
-    Logs the scraping details into the database, updating existing entries based on visiting_url.
+    Queues the scraping details for the scraping_log table, replacing any existing entry for visiting_url.
+
+    The row is written in the background by the shared ScrapingLogWriter, so the crawl never
+    blocks on log-table I/O; db_connection is kept for call-site compatibility.
     """
     try:
-        with db_connection.cursor() as cursor:
-            # Check if the visiting_url already exists in the table
-            check_query = """
-            SELECT id FROM scraping_log WHERE visiting_url = %s;
-            """
-            cursor.execute(check_query, (visiting_url,))
-            existing_record = cursor.fetchone()  # Fetch the existing record if it exists
-
-            if existing_record:
-                # If a record exists, update it
-                update_query = """
-                UPDATE scraping_log
-                SET website_name = %s, tenders_found = %s, tender_title = %s, closing_date = %s,
-                    closing_keyword = %s, filtered_keyword = %s, relevant = %s, status = %s, created_at = NOW()
-                WHERE visiting_url = %s;
-                """
-                cursor.execute(update_query, (website_name, tenders_found, tender_title, closing_date,
-                                              closing_keyword, filtered_keyword, is_relevant, status, visiting_url))
-                ScrapingLog.add_log(f"Updated existing record for visiting_url: {visiting_url}")
-            else:
-                # If no record exists, insert a new one
-                insert_query = """
-                INSERT INTO scraping_log (website_name, visiting_url, tenders_found, tender_title, closing_date,
-                                          closing_keyword, filtered_keyword, relevant, status, created_at) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, NOW());
-                """
-                cursor.execute(insert_query, (website_name, visiting_url, tenders_found, tender_title, closing_date,
-                                              closing_keyword, filtered_keyword, is_relevant, status))
-                ScrapingLog.add_log(f"Inserted new record for visiting_url: {visiting_url}")
-
-            db_connection.commit()
-            ScrapingLog.add_log("Log entry successfully inserted/updated in scraping_log table.")
-
+        scraping_log_writer.add(website_name, visiting_url, tenders_found, tender_title, closing_date,
+                                closing_keyword, filtered_keyword, is_relevant, status)
     except Exception as e:
         ScrapingLog.add_log(f"Error in logging tender details: {str(e)}")
-        if db_connection:
-            db_connection.rollback()  # Roll back if an error occurs
 
 
-def scrape_tender_details(url, title, headers, db_connection):
+def scrape_tender_details(url, title, headers, db_connection=None):
     """
     Scrapes the actual tender details from the specific URL.
 
@@ -223,12 +147,12 @@ def scrape_tender_details(url, title, headers, db_connection):
         url (str): The URL from which to scrape tender details.
         title (str): The title of the tender extracted from the search results.
         headers (dict): HTTP headers for the request.
-        db_connection: The active database connection object.
+        db_connection: Optional database connection; without one, each lookup and write checks a
+            pooled connection out only for its own statement, so none is held while fetching.
 
     Returns:
         dict or None: A dictionary containing tender info if successful, else None.
     """
-    time.sleep(random.uniform(1, 3))  # Random delay to mimic human browsing
     description = ""  # Initialize description to ensure it's defined
 
     # Extract the base domain name for logging (e.g., chrips.or.ke)
@@ -239,95 +163,115 @@ def scrape_tender_details(url, title, headers, db_connection):
     tender_title = title
 
     ScrapingLog.add_log(f"Visiting URL: {url}")
+    document = None
 
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-
-        format_type = get_format(url)
-        extracted_text = ""
-        closing_dates = []
-
-        # Fetching and processing closing dates based on format
-        if format_type == 'PDF':
-            extracted_text = extract_pdf_text(response.content)
-            closing_dates = extract_closing_dates(extracted_text, db_connection)
-        elif format_type == 'DOCX':
-            extracted_text = extract_docx_text(response.content)
-            closing_dates = extract_closing_dates(extracted_text, db_connection)
+        # Ask the server to confirm a previously extracted copy instead of resending it
+        cached = document_cache.get(url, db_connection)
+        request_headers = {**headers, **cached.conditional_headers()} if cached else headers
+
+        # Stream the body with timeouts and a size cap; large documents are spooled to disk
+        document = fetch_document(url, headers=request_headers)
+        from_cache = bool(cached) and cached.matches(document)
+
+        if from_cache:
+            # Unchanged since the last scan: reuse the extracted text without parsing the document again
+            format_type = cached.format
+            extracted_text = cached.text
+            tender_title = cached.title or tender_title
+            description = cached.description or ""
         else:
-            soup = BeautifulSoup(response.content, 'html.parser')
-            tender_title = (soup.find('h1') or soup.find('h2') or title).text.strip() if (soup.find('h1') or soup.find('h2')) else title
-            description = " ".join(p.text.strip() for p in soup.find_all('p')[:2]) if soup.find_all('p') else ""
-            extracted_text = f"{tender_title} {description}"
-            closing_dates = extract_closing_dates(extracted_text, db_connection)
+            format_type = document.format  # Sniffed from the bytes and Content-Type, not the URL suffix
+            if format_type == 'BINARY':
+                ScrapingLog.add_log(f"Skipping unsupported document type ({document.content_type}) at {url}")
+                return None
+            extracted_text = ""
+
+            # Fetching and processing closing dates based on format
+            if format_type == 'PDF':
+                # Read page by page in an extraction worker and stop at the first page that yields a deadline
+                extracted_text, closing_date_match = extraction_service.pdf_closing_date(document.source, db_connection)
+            elif format_type == 'DOCX':
+                extracted_text = extraction_service.docx_text(document.source)
+            else:
+                # Partial parse: first h1/h2 and two paragraphs, stopping as soon as they are found
+                tender_title, description = extract_html_details(document.source, title, document.content_type)
+                extracted_text = f"{tender_title} {description}"
+
+            document_cache.store(url, document, format_type, extracted_text, tender_title, description, db_connection)
+
+        if format_type != 'PDF' or from_cache:
+            # Stop at the first closing date that parses instead of collecting every candidate
+            closing_date_match = find_closing_date(extracted_text, db_connection)
 
         filtered_keyword = None
         is_relevant = "No"
         log_tenders_found = 0
 
-        if closing_dates:
-            for date, keyword in closing_dates:
-                ScrapingLog.add_log(f"Closing date for URL '{url}': {date}")
+        if closing_date_match:
+            closing_date_parsed, date, keyword = closing_date_match
+            ScrapingLog.add_log(f"Closing date for URL '{url}': {date}")
+
+            filtered_keyword = is_relevant_tender(extracted_text, db_connection)
+            if filtered_keyword:
+                is_relevant = "Yes"
+
+            try:
+                tender_info = {
+                    'title': tender_title,
+                    'description': description,
+                    'closing_date': closing_date_parsed,
+                    'source_url': url,
+                    'status': "open" if closing_date_parsed > datetime.now().date() else "closed",
+                    'format': format_type,
+                    'scraped_at': datetime.now().date(),
+                    'tender_type': 'Query Tenders'
+                }
+
+                ScrapingLog.add_log("====================================")
+                ScrapingLog.add_log("Found Tender")
+                ScrapingLog.add_log(f"Tender Title: {tender_info['title']}")
+                ScrapingLog.add_log(f"Closing Date: {closing_date_parsed}")
+                ScrapingLog.add_log(f"Closing Date Keyword Found: {keyword}")
+                ScrapingLog.add_log(f"Status: {tender_info['status']}")
+                ScrapingLog.add_log(f"Tender Type: {tender_info['tender_type']}")
+                ScrapingLog.add_log(f"Filtered Based on: {filtered_keyword}")
+                ScrapingLog.add_log(f"Relevant Tender: {is_relevant}")
+                ScrapingLog.add_log("====================================")
+
+                log_tenders_found += 1
+
+                # Prepare log details before logging
+                log_status = tender_info['status']
+                log_closing_keyword = keyword if keyword else 'None'
+                log_filtered_keyword = filtered_keyword if filtered_keyword else 'None'
+                log_is_relevant = is_relevant
+
+                # Log the scraping details
                 try:
-                    closing_date_parsed = parse_closing_date(date)
-                    filtered_keyword = is_relevant_tender(extracted_text, db_connection)
-
-                    if filtered_keyword:
-                        is_relevant = "Yes"
-
-                    tender_info = {
-                        'title': tender_title,
-                        'description': description,
-                        'closing_date': closing_date_parsed,
-                        'source_url': url,
-                        'status': "open" if closing_date_parsed > datetime.now().date() else "closed",
-                        'format': format_type,
-                        'scraped_at': datetime.now().date(),
-                        'tender_type': 'Query Tenders'
-                    }
-
-                    ScrapingLog.add_log("====================================")
-                    ScrapingLog.add_log("Found Tender")
-                    ScrapingLog.add_log(f"Tender Title: {tender_info['title']}")
-                    ScrapingLog.add_log(f"Closing Date: {closing_date_parsed}")
-                    ScrapingLog.add_log(f"Closing Date Keyword Found: {keyword}")
-                    ScrapingLog.add_log(f"Status: {tender_info['status']}")
-                    ScrapingLog.add_log(f"Tender Type: {tender_info['tender_type']}")
-                    ScrapingLog.add_log(f"Filtered Based on: {filtered_keyword}")
-                    ScrapingLog.add_log(f"Relevant Tender: {is_relevant}")
-                    ScrapingLog.add_log("====================================")
-
-                    log_tenders_found += 1
-
-                    # Prepare log details before logging
-                    log_status = tender_info['status']
-                    log_closing_keyword = keyword if keyword else 'None'
-                    log_filtered_keyword = filtered_keyword if filtered_keyword else 'None'
-                    log_is_relevant = is_relevant
-
-                    # Log the scraping details
-                    try:
-                        log_scraping_details(db_connection, website_name, url, log_tenders_found,
-                                             tender_info['title'], closing_date_parsed,
-                                             log_closing_keyword, log_filtered_keyword,
-                                             log_is_relevant, log_status)
-                    except Exception as log_error:
-                        ScrapingLog.add_log(f"Error occurred while logging details: {log_error}")
-
-                    # Insert the tender into the database only if relevant
-                    if is_relevant == "Yes":
-                        insertion_status = insert_tender_to_db(tender_info, db_connection)
-                        if insertion_status:
-                            ScrapingLog.add_log(f"Inserted into database: Success - {tender_info['title']}")
-                        else:
-                            ScrapingLog.add_log(f"Inserting into database: Failed - {tender_info['title']}")
-
-                except Exception as ve:
-                    ScrapingLog.add_log(f"Error processing closing date for tender from '{url}': {str(ve)}")
+                    log_scraping_details(db_connection, website_name, url, log_tenders_found,
+                                         tender_info['title'], closing_date_parsed,
+                                         log_closing_keyword, log_filtered_keyword,
+                                         log_is_relevant, log_status)
+                except Exception as log_error:
+                    ScrapingLog.add_log(f"Error occurred while logging details: {log_error}")
+
+                # Insert the tender into the database only if relevant
+                if is_relevant == "Yes":
+                    insertion_status = insert_tender_to_db(tender_info, db_connection)
+                    if insertion_status:
+                        ScrapingLog.add_log(f"Inserted into database: Success - {tender_info['title']}")
+                    else:
+                        ScrapingLog.add_log(f"Inserting into database: Failed - {tender_info['title']}")
+
+            except Exception as ve:
+                ScrapingLog.add_log(f"Error processing closing date for tender from '{url}': {str(ve)}")
 
         else:
             ScrapingLog.add_log(f"No closing dates found for URL: {url}")
+            # Logged as well, so the recrawl policy can back off from pages that never have a deadline
+            log_scraping_details(db_connection, website_name, url, log_tenders_found, tender_title,
+                                 None, None, None, is_relevant, 'no closing date')
 
     except requests.exceptions.HTTPError as http_err:
         ScrapingLog.add_log(f"HTTP error while fetching `{url}`: {http_err}")
@@ -335,32 +279,12 @@ def scrape_tender_details(url, title, headers, db_connection):
         ScrapingLog.add_log(f"Connection error while trying to reach `{url}`: {conn_err}")
     except Exception as e:
         ScrapingLog.add_log(f"Error scraping details from `{url}`: {str(e)}")
+    finally:
+        if document is not None:
+            document.close()  # Removes the spooled temp file, if any
 
     return None
 
-def extract_closing_dates_from_content(response, format_type, db_connection):
-    """
-    Extracts closing dates based on the content format of the response.
-
-    Args:
-        response: The HTTP response object containing content.
-        format_type (str): The format type of the content ('PDF', 'DOCX', 'HTML').
-        db_connection: The active database connection object.
-
-    Returns:
-        list: A list of closing dates and associated keywords extracted from the content.
-    """
-    if format_type == 'PDF':
-        pdf_text = extract_pdf_text(response.content)  # Extract text from the PDF
-        return extract_closing_dates(pdf_text, db_connection)  # Pass db_connection to extract closing dates
-    elif format_type == 'DOCX':
-        docx_text = extract_docx_text(response.content)  # Extract text from the DOCX
-        return extract_closing_dates(docx_text, db_connection)  # Pass db_connection to extract closing dates
-    else:  # Assuming it's HTML
-        soup = BeautifulSoup(response.content, 'html.parser')  # Parse HTML
-        page_text = soup.get_text()  # Get all text content from the page
-        return extract_closing_dates(page_text, db_connection)  # Pass db_connection to extract closing dates
-
 
 # The script's entry point when executed directly
 if __name__ == "__main__":
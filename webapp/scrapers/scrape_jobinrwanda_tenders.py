@@ -4,8 +4,9 @@ from datetime import datetime
 import logging
 import time
 from webapp.config import get_db_connection
-from webapp.routes.tenders.tender_utils import insert_tender_to_db
-from webapp.db.db import get_directory_keywords
+from webapp.db import upsert_tenders
+from webapp.cache.keyword_registry import keyword_registry
+from webapp.utils.conditional_get import fetch_if_changed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,8 +20,18 @@ def get_format(url):
         return 'DOCX'
     return 'HTML'  # Default to HTML if no specific format is found
 
-def ensure_db_connection():
-    """Check and ensure the database connection is valid."""
+def ensure_db_connection(db_connection=None):
+    """Check and ensure the database connection is valid, reusing the given one if it still works."""
+    if db_connection is not None and not db_connection.closed:
+        try:
+            cursor = db_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return db_connection
+        except Exception as e:
+            logger.warning(f"Existing database connection is unusable, checking out a new one: {str(e)}")
+            db_connection.discard()
+
     try:
         db_connection = get_db_connection()
         if db_connection is None:
@@ -41,28 +52,33 @@ def scrape_jobinrwanda_tenders():
     url = "https://www.jobinrwanda.com/jobs/tender"
     retry_attempts = 3
 
-    # Use a session for requests
-    session = requests.Session()
+    db_connection = None
 
     for attempt in range(retry_attempts):
         try:
             logger.info(f"Attempting to fetch tenders, attempt {attempt + 1}")
 
+            # Fetch keywords related to "Job in Rwanda" from the database
+            # Compiled once per keyword change and shared across runs by the keyword registry
+            keyword_set = keyword_registry.directory_keywords("Job in Rwanda")
+            keyword_matcher = keyword_set.matcher
+            if not keyword_matcher:
+                logger.warning("No keywords found for 'Job in Rwanda'. Aborting scrape.")
+                return []
+
+            # Conditional GET: an unchanged page with unchanged keywords needs no parsing and no database work
+            page = fetch_if_changed(url, fingerprint=keyword_set.fingerprint, timeout=10)
+            if page.unchanged:
+                logger.info("Job in Rwanda page unchanged since the last run. Skipping.")
+                break
+
             # Ensure we have a valid database connection
-            db_connection = ensure_db_connection()
+            db_connection = ensure_db_connection(db_connection)
             if not db_connection:
                 logger.error("Failed to establish a database connection.")
                 return []
 
-            # Fetch keywords related to "Job in Rwanda" from the database
-            keywords = get_directory_keywords(db_connection, "Job in Rwanda")
-            if not keywords:
-                logger.warning("No keywords found for 'Job in Rwanda'. Aborting scrape.")
-                return []
-            keywords = [keyword.lower() for keyword in keywords]
-
-            # Make request to fetch tenders
-            response = session.get(url, timeout=10)  # Set a timeout of 10 seconds
+            response = page.response
             if response.status_code != 200:
                 logger.error(f"Failed to retrieve tenders page, status code: {response.status_code}")
                 time.sleep(5)  # Wait before retrying
@@ -73,7 +89,8 @@ def scrape_jobinrwanda_tenders():
 
             # Find all tender cards
             tender_cards = soup.find_all('article', class_='node--type-job')
-            logger.info(f"Found {len(tender_cards)} tenders.")        
+            logger.info(f"Found {len(tender_cards)} tenders.")
+            tender_batch = []  # Matching tenders, saved in one batched upsert
 
             # Iterate through each tender card
             for card in tender_cards:
@@ -91,7 +108,7 @@ def scrape_jobinrwanda_tenders():
                     continue
 
                 # Check if the title contains any of the keywords
-                matched_keywords = [keyword for keyword in keywords if keyword in title]
+                matched_keywords = keyword_matcher.find_all(title)
                 if matched_keywords:
                     description_tag = card.find('p', class_='card-text')
                     description = description_tag.get_text(strip=True) if description_tag else "N/A"
@@ -101,7 +118,6 @@ def scrape_jobinrwanda_tenders():
 
                     if closing_date_str:
                         closing_date = datetime.fromisoformat(closing_date_str.replace('Z', '+00:00')).date()
-                        status = "open" if closing_date > datetime.now().date() else "closed"
 
                         format_type = get_format(source_url)
 
@@ -110,23 +126,27 @@ def scrape_jobinrwanda_tenders():
                             'description': description,
                             'closing_date': closing_date,
                             'source_url': source_url,
-                            'status': status,
                             'format': format_type,
                             'scraped_at': datetime.now().date(),
                             'tender_type': "Job in Rwanda"
                         }
 
-                        # Ensure database connection is still valid before insertion
-                        db_connection = ensure_db_connection()
-                        if not db_connection:
-                            logger.error("Database connection dropped. Reattempting insertion.")
-                            continue  # Skip to the next tender if the connection failed
-
-                        # Insert the tender into the database
-                        insert_tender_to_db(tender_data, db_connection)
-                        logger.info(f"Tender inserted into database: {title}")
+                        tender_batch.append(tender_data)
                         logger.info(f"Matched keywords: {', '.join(matched_keywords)} for tender: {title}")
 
+            # Ensure database connection is still valid before the batched insertion
+            db_connection = ensure_db_connection(db_connection)
+            if not db_connection:
+                logger.error("Database connection dropped. Reattempting insertion.")
+                time.sleep(5)
+                continue  # Retry the whole attempt if the connection failed
+
+            counts = upsert_tenders(tender_batch, db_connection)
+            logger.info(f"Job in Rwanda tenders saved: {counts['inserted']} inserted, {counts['updated']} updated, "
+                        f"{counts['unchanged']} unchanged, {counts['failed']} failed.")
+            if not counts['failed']:
+                page.mark_processed()  # Only skip the page next time once everything on it was saved
+
             break  # Exit retry loop after successful execution
 
         except requests.RequestException as e:
@@ -136,7 +156,8 @@ def scrape_jobinrwanda_tenders():
             logger.error(f"An unexpected error occurred: {str(e)}")
             time.sleep(5)
 
-    session.close()  # Close the session after the task
+    if db_connection:
+        db_connection.close()  # Return the connection to the pool
     logger.info("Scraping completed.")
 
 if __name__ == "__main__":
@@ -1,10 +1,10 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
 import logging
 from webapp.config import get_db_connection
-from webapp.routes.tenders.tender_utils import insert_tender_to_db
-from webapp.db.db import get_directory_keywords
+from webapp.db import upsert_tenders
+from webapp.cache.keyword_registry import keyword_registry
+from webapp.utils.conditional_get import fetch_if_changed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,8 +19,18 @@ def get_format(url):
             return 'DOCX'
     return 'HTML'  # Default to HTML if no specific format is found
 
-def ensure_db_connection():
-    """Check and ensure the database connection is valid."""
+def ensure_db_connection(db_connection=None):
+    """Check and ensure the database connection is valid, reusing the given one if it still works."""
+    if db_connection is not None and not db_connection.closed:
+        try:
+            cursor = db_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return db_connection
+        except Exception as e:
+            logger.warning(f"Existing database connection is unusable, checking out a new one: {str(e)}")
+            db_connection.discard()
+
     try:
         db_connection = get_db_connection()
         if db_connection is None:
@@ -39,10 +49,24 @@ def ensure_db_connection():
 def scrape_treasury_ke_tenders():
     """Scrapes tenders from the Kenya Treasury website and inserts them into the database."""
     url = "https://www.treasury.go.ke/tenders/"
+    db_connection = None
 
     try:
-        response = requests.get(url)
+        # Fetch keywords related to "Kenya Treasury" from the database
+        # Compiled once per keyword change and shared across runs by the keyword registry
+        keyword_set = keyword_registry.directory_keywords("Kenya Treasury")
+        keyword_matcher = keyword_set.matcher
+        if not keyword_matcher:
+            logger.warning("No keywords found for 'Kenya Treasury'. Aborting scrape.")
+            return
 
+        # Conditional GET: an unchanged page with unchanged keywords needs no parsing and no database work
+        page = fetch_if_changed(url, fingerprint=keyword_set.fingerprint)
+        if page.unchanged:
+            logger.info("Kenya Treasury page unchanged since the last run. Skipping.")
+            return
+
+        response = page.response
         if response.status_code != 200:
             logger.error(f"Failed to retrieve Kenya Treasury page, status code: {response.status_code}")
             return
@@ -65,13 +89,8 @@ def scrape_treasury_ke_tenders():
             logger.error("Failed to establish a database connection.")
             return
 
-        # Fetch keywords related to "Kenya Treasury" from the database
-        keywords = get_directory_keywords(db_connection, "Kenya Treasury")
-        if not keywords:
-            logger.warning("No keywords found for 'Kenya Treasury'. Aborting scrape.")
-            return
-        keywords = [keyword.lower() for keyword in keywords]
         current_year = datetime.now().year  # Get the current year
+        tender_batch = []  # Matching tenders, saved in one batched upsert
 
         for row in rows:
             columns = row.find_all('td')
@@ -96,11 +115,9 @@ def scrape_treasury_ke_tenders():
                 continue
 
             # Check if the title contains any of the keywords
-            if not any(keyword in title.lower() for keyword in keywords):
+            if not keyword_matcher.search(title):
                 continue  # Skip if there are no matching keywords
 
-            status = "open" if deadline_date > datetime.now().date() else "closed"
-
             # Determine the format based on the document URL
             format_type = get_format(document_url)
 
@@ -109,31 +126,31 @@ def scrape_treasury_ke_tenders():
                 'description': reference_number,
                 'closing_date': deadline_date,
                 'source_url': document_url,
-                'status': status,
                 'format': format_type,  # Set format based on URL
                 'scraped_at': datetime.now().date(),
                 'tender_type': "Kenya Treasury"  # Specifying the tender type
             }
 
-            # Ensure database connection is valid before insertion
-            db_connection = ensure_db_connection()
-            if not db_connection:
-                logger.error("Database connection dropped. Skipping insertion.")
-                continue  # Skip to the next tender if the connection failed
+            tender_batch.append(tender_data)
+            logger.info(f"Title: {title}\n"
+                        f"Reference Number: {reference_number}\n"
+                        f"Closing Date: {deadline_date}\n"
+                        f"Source URL: {document_url}\n"  # Include the URL in logs
+                        f"Format: {format_type}\n"  # Display the determined format
+                        f"Tender Type: Kenya Treasury\n")
+            logger.info("=" * 40)  # Separator for readability
+
+        # Ensure database connection is valid before the batched insertion
+        db_connection = ensure_db_connection(db_connection)
+        if not db_connection:
+            logger.error("Database connection dropped. Skipping insertion.")
+            return
 
-            try:
-                insert_tender_to_db(tender_data, db_connection)  # Insert the tender
-                logger.info(f"Tender inserted into database: {title}")
-                logger.info(f"Title: {title}\n"
-                            f"Reference Number: {reference_number}\n"
-                            f"Closing Date: {deadline_date}\n"
-                            f"Status: {status}\n"
-                            f"Source URL: {document_url}\n"  # Include the URL in logs
-                            f"Format: {format_type}\n"  # Display the determined format
-                            f"Tender Type: Kenya Treasury\n")
-                logger.info("=" * 40)  # Separator for readability
-            except Exception as e:
-                logger.error(f"Error inserting tender '{title}' into database: {e}")
+        counts = upsert_tenders(tender_batch, db_connection)
+        logger.info(f"Kenya Treasury tenders saved: {counts['inserted']} inserted, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged, {counts['failed']} failed.")
+        if not counts['failed']:
+            page.mark_processed()  # Only skip the page next time once everything on it was saved
 
         logger.info("Scraping completed.")
 
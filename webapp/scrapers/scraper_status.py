@@ -6,5 +6,6 @@ scraping_status = {
     'irrelevant_count': 0,
     'open_count': 0,
     'closed_count': 0,
+    'progress': 0,  # Percentage of the scan's queries done
     'tenders': []  # New field to store tenders' detailed info
 }
\ No newline at end of file
@@ -0,0 +1,193 @@
+import re
+import base64
+import logging
+import binascii
+from collections import namedtuple
+from urllib.parse import urljoin, urlparse, parse_qs, unquote
+import lxml.html
+from lxml import etree
+
+# One organic search result
+SerpResult = namedtuple('SerpResult', ['url', 'title', 'snippet'])
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_YAHOO_TARGET_RE = re.compile(r'/RU=([^/]+)/')
+
+
+def _has_class(name):
+    """XPath predicate matching elements with a CSS class, not just a class attribute containing the text."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _clean(text):
+    return _WHITESPACE_RE.sub(' ', text or '').strip()
+
+
+def _query_param(url, name):
+    values = parse_qs(urlparse(url).query).get(name)
+    return values[0] if values else None
+
+
+class SerpParser:
+    """
+    Extracts the organic results from one search engine's result page.
+
+    Subclasses set precompiled XPath expressions: `results` selects the title
+    link of every organic result, `title` and `snippet` are evaluated relative
+    to that link. Navigation, ads, related searches and footer links are never
+    selected, so they are neither decoded nor fetched. resolve() unwraps the
+    engine's click-tracking redirect, if any.
+    """
+
+    engine = None
+    base_url = None
+    results = None
+    title = etree.XPath("string(.)")
+    snippet = None
+
+    def parse(self, content):
+        """
+        Parses a result page.
+
+        Args:
+            content (bytes or str): The HTML of the search result page.
+
+        Returns:
+            list: SerpResult tuples in page order; empty if the page could not be parsed.
+        """
+        try:
+            tree = lxml.html.document_fromstring(content)
+        except (etree.ParserError, ValueError) as e:
+            logging.warning(f"Could not parse the {self.engine} result page: {str(e)}")
+            return []
+
+        found = []
+        for link in self.results(tree):
+            url = self.resolve(link.get('href', ''))
+            if not url:
+                continue
+            snippet = _clean(self.snippet(link)) if self.snippet is not None else ''
+            found.append(SerpResult(url, _clean(self.title(link)), snippet))
+
+        if not found:
+            logging.warning(f"No organic results found on the {self.engine} result page; its markup may have changed.")
+        return found
+
+    def resolve(self, href):
+        """The target of a result link, or None if it does not lead to an http(s) page."""
+        url = urljoin(self.base_url, href.strip())
+        return url if url.startswith(('http://', 'https://')) else None
+
+
+class GoogleParser(SerpParser):
+    engine = 'Google'
+    base_url = 'https://www.google.com'
+    # Result titles are links wrapping an h3, both in the full and the basic (no-JS) layout
+    results = etree.XPath("//a[@href][h3 or div[h3]]")
+    title = etree.XPath("string(.//h3)")
+    snippet = etree.XPath(
+        f"string((ancestor::div[{_has_class('g')}][1]//div[{_has_class('VwiC3b')}]"
+        f" | ancestor::div[{_has_class('Gx5Zad')}][1]//div[{_has_class('s3v9rd')}])[1])"
+    )
+
+    def resolve(self, href):
+        url = super().resolve(href)
+        # The basic layout links through /url?q=<target>
+        if url and urlparse(url).netloc.endswith('google.com') and urlparse(url).path == '/url':
+            url = _query_param(url, 'q') or _query_param(url, 'url')
+            return url if url and url.startswith(('http://', 'https://')) else None
+        return url
+
+
+class BingParser(SerpParser):
+    engine = 'Bing'
+    base_url = 'https://www.bing.com'
+    results = etree.XPath(f"//li[{_has_class('b_algo')}]//h2/a[@href]")
+    snippet = etree.XPath(f"string((ancestor::li[{_has_class('b_algo')}][1]//p)[1])")
+
+    def resolve(self, href):
+        url = super().resolve(href)
+        # Tracked links look like bing.com/ck/a?...&u=a1<base64url of the target>
+        if url and urlparse(url).netloc.endswith('bing.com') and urlparse(url).path.startswith('/ck/'):
+            encoded = _query_param(url, 'u') or ''
+            if not encoded.startswith('a1'):
+                return None
+            try:
+                encoded = encoded[2:]
+                url = base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode('utf-8')
+            except (binascii.Error, UnicodeDecodeError):
+                return None
+            return url if url.startswith(('http://', 'https://')) else None
+        return url
+
+
+class YahooParser(SerpParser):
+    engine = 'Yahoo'
+    base_url = 'https://search.yahoo.com'
+    results = etree.XPath(f"//div[{_has_class('algo')}]//h3/a[@href]")
+    # The link text also holds the breadcrumb; aria-label is the bare title
+    title = etree.XPath("string(@aria-label | self::*[not(@aria-label)])")
+    snippet = etree.XPath(f"string((ancestor::div[{_has_class('algo')}][1]//div[{_has_class('compText')}])[1])")
+
+    def resolve(self, href):
+        url = super().resolve(href)
+        # Tracked links look like r.search.yahoo.com/.../RU=<quoted target>/RK=...
+        match = _YAHOO_TARGET_RE.search(url or '')
+        if match:
+            url = unquote(match.group(1))
+            return url if url.startswith(('http://', 'https://')) else None
+        return url
+
+
+class DuckDuckGoParser(SerpParser):
+    engine = 'DuckDuckGo'
+    base_url = 'https://html.duckduckgo.com'
+    results = etree.XPath(f"//a[{_has_class('result__a')}][@href]")
+    snippet = etree.XPath(f"string((ancestor::div[{_has_class('result')}][1]//*[{_has_class('result__snippet')}])[1])")
+
+    def resolve(self, href):
+        url = super().resolve(href)
+        # Tracked links look like //duckduckgo.com/l/?uddg=<quoted target>
+        if url and urlparse(url).netloc.endswith('duckduckgo.com') and urlparse(url).path.startswith('/l/'):
+            url = _query_param(url, 'uddg')
+            return url if url and url.startswith(('http://', 'https://')) else None
+        return url
+
+
+class AskParser(SerpParser):
+    engine = 'Ask'
+    base_url = 'https://www.ask.com'
+    results = etree.XPath(
+        f"//a[@href][{_has_class('PartialSearchResults-item-title-link')} or {_has_class('result-title-link')}]"
+    )
+    snippet = etree.XPath(
+        f"string((ancestor::div[{_has_class('PartialSearchResults-item')} or {_has_class('result')}][1]"
+        f"//*[{_has_class('PartialSearchResults-item-abstract')} or {_has_class('result-abstract')}])[1])"
+    )
+
+
+SERP_PARSERS = {parser.engine: parser for parser in (
+    GoogleParser(), BingParser(), YahooParser(), DuckDuckGoParser(), AskParser()
+)}
+
+
+def parse_serp(engine, content):
+    """
+    Extracts the organic results from a search engine result page.
+
+    Args:
+        engine (str): The search engine name, as used by construct_search_url.
+        content (bytes or str): The HTML of the result page.
+
+    Returns:
+        list: SerpResult(url, title, snippet) tuples; empty for unsupported engines.
+
+    Usage:
+        for result in parse_serp('Bing', response.content):
+            visit(result.url, result.title)
+    """
+    parser = SERP_PARSERS.get(engine)
+    if parser is None:
+        logging.error(f"No result parser for search engine '{engine}'.")
+        return []
+    return parser.parse(content)
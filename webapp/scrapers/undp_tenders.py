@@ -1,10 +1,10 @@
 import re
 from datetime import datetime
-import requests
 from bs4 import BeautifulSoup
 from webapp.config import get_db_connection
-from webapp.routes.tenders.tender_utils import insert_tender_to_db
-from webapp.db.db import get_directory_keywords
+from webapp.db import upsert_tenders
+from webapp.cache.keyword_registry import keyword_registry
+from webapp.utils.conditional_get import fetch_if_changed
 import logging
 
 # Configure logging
@@ -19,8 +19,18 @@ def get_format(url):
         return 'DOCX'
     return 'HTML'  # Default to HTML if no specific format is found
 
-def ensure_db_connection():
-    """Check and ensure the database connection is valid."""
+def ensure_db_connection(db_connection=None):
+    """Check and ensure the database connection is valid, reusing the given one if it still works."""
+    if db_connection is not None and not db_connection.closed:
+        try:
+            cursor = db_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return db_connection
+        except Exception as e:
+            logger.warning(f"Existing database connection is unusable, checking out a new one: {str(e)}")
+            db_connection.discard()
+
     try:
         db_connection = get_db_connection()
         if db_connection is None:
@@ -39,22 +49,30 @@ def ensure_db_connection():
 def scrape_undp_tenders():
     """Scrapes tenders from the UNDP procurement notices page and inserts them into the database."""
     url = "https://procurement-notices.undp.org/"
+    db_connection = None
 
     try:
+        # Fetch keywords related to UNDP from the database
+        # Compiled once per keyword change and shared across runs by the keyword registry
+        keyword_set = keyword_registry.directory_keywords("UNDP")
+        keyword_matcher = keyword_set.matcher
+        if not keyword_matcher:
+            logger.warning("No keywords found for 'UNDP'. Aborting scrape.")
+            return
+
+        # Conditional GET: an unchanged page with unchanged keywords needs no parsing and no database work
+        page = fetch_if_changed(url, fingerprint=keyword_set.fingerprint)
+        if page.unchanged:
+            logger.info("UNDP page unchanged since the last run. Skipping.")
+            return
+
         # Ensure a valid database connection
         db_connection = ensure_db_connection()
         if not db_connection:
             logger.error("Failed to establish a database connection.")
             return
 
-        # Fetch keywords related to UNDP from the database
-        keywords = get_directory_keywords(db_connection, "UNDP")
-        if not keywords:
-            logger.warning("No keywords found for 'UNDP'. Aborting scrape.")
-            return
-        keywords = [keyword.lower() for keyword in keywords]
-
-        response = requests.get(url)
+        response = page.response
         if response.status_code != 200:
             logger.error(f"Failed to retrieve UNDP page, status code: {response.status_code}")
             return
@@ -65,13 +83,14 @@ def scrape_undp_tenders():
         # Find all tender links
         tenders = soup.find_all('a', class_='vacanciesTableLink')
         logger.info(f"Found {len(tenders)} tenders.")
+        tender_batch = []  # Matching tenders, saved in one batched upsert
 
         for tender in tenders:
             title_label = tender.find('div', class_='vacanciesTable__cell__label', string=lambda x: x and 'Title' in x.strip())
             title = title_label.find_next_sibling('span').text.strip() if title_label else "N/A"
 
             # Check if the title contains any of the keywords
-            if not any(keyword in title.lower() for keyword in keywords):
+            if not keyword_matcher.search(title):
                 continue  # Skip if there are no matching keywords
 
             ref_no_label = tender.find('div', class_='vacanciesTable__cell__label', string=lambda x: x and 'Ref No' in x.strip())
@@ -112,25 +131,27 @@ def scrape_undp_tenders():
                 'tender_type': "UNDP"
             }
 
-            # Ensure database connection is valid before insertion
-            db_connection = ensure_db_connection()
-            if not db_connection:
-                logger.error("Database connection dropped. Skipping insertion.")
-                continue  # Skip to the next tender if the connection failed
+            tender_batch.append(tender_data)
+            logger.info(f"Title: {title}\n"
+                        f"Reference Number: {reference_number}\n"
+                        f"Closing Date: {deadline_date}\n"
+                        f"Status: {status}\n"
+                        f"Source URL: {source_url}\n"
+                        f"Format: {format_type}\n"
+                        f"Tender Type: UNDP\n")
+            logger.info("=" * 40)  # Separator for readability
+
+        # Ensure database connection is valid before the batched insertion
+        db_connection = ensure_db_connection(db_connection)
+        if not db_connection:
+            logger.error("Database connection dropped. Skipping insertion.")
+            return
 
-            try:
-                insert_tender_to_db(tender_data, db_connection)  # Insert into the database
-                logger.info(f"Tender inserted into database: {title}")
-                logger.info(f"Title: {title}\n"
-                            f"Reference Number: {reference_number}\n"
-                            f"Closing Date: {deadline_date}\n"
-                            f"Status: {status}\n"
-                            f"Source URL: {source_url}\n"
-                            f"Format: {format_type}\n"
-                            f"Tender Type: UNDP\n")
-                logger.info("=" * 40)  # Separator for readability
-            except Exception as e:
-                logger.error(f"Error inserting tender '{title}' into database: {e}")
+        counts = upsert_tenders(tender_batch, db_connection)
+        logger.info(f"UNDP tenders saved: {counts['inserted']} inserted, {counts['updated']} updated, "
+                    f"{counts['unchanged']} unchanged, {counts['failed']} failed.")
+        if not counts['failed']:
+            page.mark_processed()  # Only skip the page next time once everything on it was saved
 
         logger.info("Scraping completed.")
 
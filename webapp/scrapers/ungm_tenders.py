@@ -8,8 +8,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from webapp.config import get_db_connection
-from webapp.routes.tenders.tender_utils import insert_tender_to_db
-from webapp.db.db import get_directory_keywords
+from webapp.db import upsert_tenders
+from webapp.cache.keyword_registry import keyword_registry
 import logging
 
 # Configure Python logging
@@ -47,8 +47,18 @@ def extract_deadline_date(tender):
         logging.error(f"Error extracting deadline date: {e}")
         return None
 
-def ensure_db_connection():
-    """Check and ensure the database connection is valid."""
+def ensure_db_connection(db_connection=None):
+    """Check and ensure the database connection is valid, reusing the given one if it still works."""
+    if db_connection is not None and not db_connection.closed:
+        try:
+            cursor = db_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return db_connection
+        except Exception as e:
+            logging.warning(f"Existing database connection is unusable, checking out a new one: {str(e)}")
+            db_connection.discard()
+
     try:
         db_connection = get_db_connection()
         if db_connection is None:
@@ -168,11 +178,11 @@ def scrape_ungm_tenders():
             logging.error("Failed to establish a database connection.")
             return
 
-        keywords = get_directory_keywords(db_connection, 'UNGM')
-        if not keywords:
+        # Compiled once per keyword change and shared across runs by the keyword registry
+        keyword_matcher = keyword_registry.directory_keywords('UNGM', db_connection).matcher
+        if not keyword_matcher:
             logging.error("No keywords found for 'UNGM'. Aborting scrape.")
             return
-        keywords = [keyword.lower() for keyword in keywords]
 
         driver = setup_selenium_driver()
 
@@ -213,6 +223,7 @@ def scrape_ungm_tenders():
             logging.info(f"Total tenders after dynamic load for {country}: {total_dynamic_tenders}")
 
             found_for_keyword = 0
+            tender_batch = []  # Matching tenders for this country
 
             for tender in tenders:
                 title_elem = tender.find('div', class_='resultTitle')
@@ -245,27 +256,20 @@ def scrape_ungm_tenders():
                     'tender_type': "UNGM",
                 }
 
-                if any(keyword in title.lower() for keyword in keywords):
+                if keyword_matcher.search(title):
                     found_for_keyword += 1
-                    try:
-                        # Attempt to execute an insert, reconnecting if there's an issue
-                        if db_connection is None:
-                            logging.warning("Database connection is None. Attempting to reconnect...")
-                            db_connection = ensure_db_connection()  # Reopen connection
-
-                        insert_tender_to_db(tender_data, db_connection)
-                        logging.info(f"Inserted tender from {country}: {title} | Source URL: {source_url}")
-
-                    except Exception as e:
-                        logging.error(f"Error inserting tender '{title}' from {country} into database: {e}")
-                        # Attempt to reconnect & retry insert
-                        db_connection = ensure_db_connection()  # Attempt to re-establish connection
-                        if db_connection:
-                            try:
-                                insert_tender_to_db(tender_data, db_connection)  # Retry insert
-                                logging.info(f"Reinserted tender from {country}: {title} | Source URL: {source_url}")
-                            except Exception as retry_exception:
-                                logging.error(f"Error reinserting tender '{title}' from {country}: {retry_exception}")
+                    tender_batch.append(tender_data)
+                    logging.info(f"Matched tender from {country}: {title} | Source URL: {source_url}")
+
+            # Save this country's matches in one batched upsert, reconnecting if there's an issue
+            if tender_batch:
+                db_connection = ensure_db_connection(db_connection)
+                if db_connection is None:
+                    logging.error(f"Database connection unavailable. Skipping {len(tender_batch)} tenders from {country}.")
+                else:
+                    counts = upsert_tenders(tender_batch, db_connection)
+                    logging.info(f"Tenders saved from {country}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                                 f"{counts['unchanged']} unchanged, {counts['failed']} failed.")
 
             logging.info(f"{found_for_keyword} tenders found for the specified keywords from {country}.")
             logging.info(f"{country} tender scraping completed.")
@@ -0,0 +1,85 @@
+import threading
+from urllib.parse import urlsplit, urlunsplit, unquote_plus
+
+# Query parameters that only track where a click came from and never change the page
+TRACKING_PARAMS = frozenset({
+    'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'srsltid',
+})
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _is_tracking_param(pair):
+    name = unquote_plus(pair.split('=', 1)[0]).lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url):
+    """
+    Canonical form of a URL for de-duplication and fetching.
+
+    Lower-cases the scheme and host, drops default ports, the fragment and
+    tracking parameters (utm_*, gclid, fbclid, ...), and keeps every other
+    query parameter exactly as written and in its original order.
+
+    Args:
+        url (str): An absolute http(s) URL.
+
+    Returns:
+        str: The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None  # Malformed port, keep the host only
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{netloc}"
+
+    query = '&'.join(pair for pair in parts.query.split('&') if pair and not _is_tracking_param(pair))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+class UrlFrontier:
+    """
+    Run-scoped record of the URLs a scan has already scheduled.
+
+    Every search-engine result goes through admit(), so a tender page returned
+    by several engines or queries in one scan is fetched and parsed once. A
+    plain set is enough: a scan sees thousands of URLs at most.
+
+    Usage:
+        frontier = UrlFrontier()
+        url = frontier.admit(result_url)
+        if url:
+            visit(url)
+    """
+
+    def __init__(self):
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def admit(self, url):
+        """
+        Schedules a URL unless an equivalent one was seen before in this run.
+
+        Returns:
+            str: The normalized URL to fetch, or None if it was already scheduled.
+        """
+        normalized = normalize_url(url)
+        with self._lock:
+            if normalized in self._seen:
+                return None
+            self._seen.add(normalized)
+        return normalized
+
+    def __contains__(self, url):
+        return normalize_url(url) in self._seen
+
+    def __len__(self):
+        return len(self._seen)
@@ -1,9 +1,13 @@
 from webapp.config import get_db_connection  # Import function to establish database connection
 from webapp.scrapers.scraper import scrape_tenders  # Import the function used for scraping tenders
+from webapp.scrapers.url_frontier import UrlFrontier  # Run-wide de-duplication of result links
+from webapp.scrapers.query_planner import SiteQuery, plan_site_queries  # Batched site: searches
 from datetime import datetime  # For handling date and time
 from webapp.services.log import ScrapingLog  # Import your custom logging class
 from webapp.scrapers.scraper_status import scraping_status  # Import the global scraping status
+from webapp.db.log_writer import scraping_log_writer  # Buffered scraping_log writes
 import logging
+from collections import Counter
 
 def fetch_urls_and_terms(db_connection):
     """
@@ -38,13 +42,55 @@ def fetch_urls_and_terms(db_connection):
 
 
 
+def reset_scraping_status():
+    """Clears the totals and tenders of the previous scan before a new one starts."""
+    scraping_status.update({
+        'complete': False,
+        'total_found': 0,
+        'relevant_count': 0,
+        'irrelevant_count': 0,
+        'open_count': 0,
+        'closed_count': 0,
+        'progress': 0,
+        'tenders': [],
+    })
+
+
+def record_tender(tender, website=None):
+    """
+    Adds one scraped tender to the running totals of the current scan.
+
+    Called by scrape_tenders as each result page is scraped, so the progress
+    log shows the tenders and counts while the scan is still running.
+
+    Args:
+        tender (dict): The tender returned by scrape_tender_details.
+        website (str, optional): The uploaded website the tender was found on; stored as tender['website'].
+    """
+    if website:
+        tender['website'] = website
+    scraping_status['tenders'].append(tender)
+    scraping_status['total_found'] += 1
+
+    if tender.get('is_relevant', 'No') == "Yes":  # Default to 'No'
+        scraping_status['relevant_count'] += 1
+    else:
+        scraping_status['irrelevant_count'] += 1
+
+    status = tender.get('status', 'unknown')  # Default to 'unknown'
+    if status == "open":
+        scraping_status['open_count'] += 1
+    elif status == "closed":
+        scraping_status['closed_count'] += 1
+
+
 def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_type=None, terms=None, website=None):
     """
     Scrapes tenders from specified websites using search terms and stores results in the database.
     """
     db_connection = None
     global scraping_status  # Access the global variable to update scraping status
-    scraping_status['tenders'] = []
+    reset_scraping_status()
 
     try:
         terms = terms or []
@@ -70,50 +116,44 @@ def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_ty
 
         current_year = datetime.now().year
 
-        google_queries = [
-            f'site:{url.split("//")[1].rstrip("/")} ' +
+        # Construct queries for Google, packing as many site: operators into each one as its word limit allows
+        google_queries = plan_site_queries(
+            urls,
             " OR ".join([f'"{term}"' for term in terms]) +
-            (f" {current_year}" if time_frame == 'y' else '') +
+            (f" {current_year}" if time_frame == 'y' else ''),
             (f"&as_qdr={time_frame}" if time_frame != 'anytime' else '') +
             f"&as_eq=&as_nlo=&as_nhi=&lr=&" +
             (f"as_filetype={file_type}&" if file_type and file_type != 'any' else "") +
             f"as_occt=any&" +
             f"tbs="
-            for url in urls
-        ]
+        )
 
         # Construct queries for Bing
-        bing_queries = [
+        bing_queries = [SiteQuery(
             " OR ".join([f'"{term}"' for term in terms]) +
             (f" {current_year}" if time_frame == 'y' else '') +
             (f"&qft=+filterui:date:y" if time_frame == 'y' else '') +
-            (f"&filter=all" if file_type and file_type != 'any' else '') +  # Add appropriate file type filter
-            (f"site:{region} " if region and region != 'any' else '')  # Region-based filter if needed
-        ]
+            (f"&filter=all" if file_type and file_type != 'any' else '')  # Add appropriate file type filter
+        )]
 
         # Construct queries for Yahoo (similar to Bing)
         yahoo_queries = bing_queries  # For simplicity, assuming Yahoo uses similar queries as Bing
 
         # Construct queries for DuckDuckGo
-        duckduckgo_queries = [
+        duckduckgo_queries = [SiteQuery(
             " OR ".join([f'"{term}"' for term in terms]) +
             (f" {current_year}" if time_frame == 'y' else '') +
-            (f"&t=hg" if file_type and file_type != 'any' else '') +  # Potential file type filtering
-            (f"site:{region} " if region and region != 'any' else '')  # Use site filter for regional search
-        ]
+            (f"&t=hg" if file_type and file_type != 'any' else '')  # Potential file type filtering
+        )]
 
         # Construct queries for Ask.com
-        ask_queries = [
+        ask_queries = [SiteQuery(
             " OR ".join([f'"{term}"' for term in terms]) +
             (f" {current_year}" if time_frame == 'y' else '') +
-            (f"&filetype={file_type}" if file_type and file_type != 'any' else '') +  # File type
-            (f"site:{region}" if region and region != 'any' else '')  # Regional search
-        ]
+            (f"&filetype={file_type}" if file_type and file_type != 'any' else '')  # File type
+        )]
 
 
-        # Initialize lists for storing all scraped tenders and counting found tenders
-        all_tenders = []
-        total_found_tenders = 0
         ScrapingLog.clear_logs()  # Clear logs before starting
 
         ScrapingLog.add_log("Starting the scraping process.")
@@ -122,6 +162,7 @@ def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_ty
         all_queries = []
         if 'Google' in selected_engines:
             all_queries.extend(google_queries)
+            ScrapingLog.add_log(f"Planned {len(google_queries)} Google queries for {len(urls)} websites.")
         if 'Bing' in selected_engines:
             all_queries.extend(bing_queries)
         if 'Yahoo' in selected_engines:
@@ -131,75 +172,38 @@ def scrape_tenders_from_websites(selected_engines=None, time_frame=None, file_ty
         if 'Ask' in selected_engines:
             all_queries.extend(ask_queries)
 
-            # Choose queries based on selected engines
-        for query in all_queries:
+        # One pass over the queries; every tender updates the totals as soon as its page is scraped
+        frontier = UrlFrontier()  # Shared by all queries, so each result link is visited once per scan
+        for i, query in enumerate(all_queries):
             ScrapingLog.add_log(f"Scraping for query: {query}")  # Log the current query being scraped
-            # Call the scraping function and collect the returned tenders
-            scraped_tenders = scrape_tenders(db_connection, query, selected_engines)
-
-            # Count the total number of tenders found after scraping each query
-            if scraped_tenders is not None:  # Check for None response
-                total_found_tenders += len(scraped_tenders)
-                all_tenders.extend(scraped_tenders)
-
-        ScrapingLog.add_log(f"Scraping completed. Total tenders found: {total_found_tenders}")  # Log to ScrapingLog
-
-        # Update scraping status to complete
-        scraping_status['complete'] = True
-
-        total_found_tenders = 0
-        total_relevant_tenders = 0
-        total_irrelevant_tenders = 0
-        total_open_tenders = 0
-        total_closed_tenders = 0
-
-        for query in all_queries:
-            ScrapingLog.add_log(f"Scraping for query: {query}")
 
             try:
-                scraped_tenders = scrape_tenders(db_connection, query, selected_engines)
-
-                total_found_tenders += len(scraped_tenders)
-
-                for tender in scraped_tenders:
-                    scraping_status['tenders'].append(tender)
-                    # Assuming each tender is a dictionary returned from scrape_tender_details
-                    is_relevant = tender.get('is_relevant', 'No')  # Default to 'No'
-                    status = tender.get('status', 'unknown')  # Default to 'unknown'
-
-                    if is_relevant == "Yes":
-                        total_relevant_tenders += 1
-                    else:
-                        total_irrelevant_tenders += 1
-
-                    if status == "open":
-                        total_open_tenders += 1
-                    elif status == "closed":
-                        total_closed_tenders += 1
-
+                # Credit each tender to the uploaded website whose site: operator matched it
+                scrape_tenders(db_connection, query.query, selected_engines, frontier=frontier,
+                               on_tender=lambda tender: record_tender(tender, query.source_of(tender['source_url'])))
             except Exception as e:
                 ScrapingLog.add_log(f"Error scraping for query {query}: {e}")
 
-                # Log counts after processing all queries
-                ScrapingLog.add_log(f"Scraping completed. Total tenders found: {total_found_tenders}, "
-                                    f"Relevant: {total_relevant_tenders}, "
-                                    f"Irrelevant: {total_irrelevant_tenders}, "
-                                    f"Open: {total_open_tenders}, "
-                                    f"Closed: {total_closed_tenders}")
-
-        scraping_status.update({
-            'complete': True,
-            'total_found': total_found_tenders,
-            'relevant_count': total_relevant_tenders,
-            'irrelevant_count': total_irrelevant_tenders,
-            'open_count': total_open_tenders,
-            'closed_count': total_closed_tenders
-        })
+            scraping_status['progress'] = int((i + 1) / len(all_queries) * 100)
+            ScrapingLog.add_log(f"Progress: {scraping_status['progress']}% "
+                                f"({i + 1}/{len(all_queries)} queries, {scraping_status['total_found']} tenders found)")
+
+        # Log counts after processing all queries
+        ScrapingLog.add_log(f"Scraping completed. Total tenders found: {scraping_status['total_found']}, "
+                            f"Relevant: {scraping_status['relevant_count']}, "
+                            f"Irrelevant: {scraping_status['irrelevant_count']}, "
+                            f"Open: {scraping_status['open_count']}, "
+                            f"Closed: {scraping_status['closed_count']}")
+        for website, count in Counter(tender.get('website') for tender in scraping_status['tenders']
+                                      if tender.get('website')).most_common():
+            ScrapingLog.add_log(f"Tenders found on {website}: {count}")
 
     except Exception as e:
         ScrapingLog.add_log(f"An error occurred while scraping: {e}")  # Log the error
 
     finally:
+        scraping_status['complete'] = True  # Also on errors, so pollers stop waiting
+        scraping_log_writer.flush()  # Make this run's page logs visible once the scan ends
         if db_connection is not None:
             db_connection.close()  # Ensure the database connection is closed
             ScrapingLog.add_log("Database connection closed.")  # Log closing database connection
@@ -0,0 +1,218 @@
+import os
+import queue
+import atexit
+import logging
+import threading
+import multiprocessing
+from webapp.config.config import EXTRACTION_WORKERS, EXTRACTION_MAX_TASKS_PER_CHILD, EXTRACTION_TIMEOUT
+from webapp.cache.keyword_registry import keyword_registry, KeywordSet
+
+PDF = 'pdf'
+DOCX = 'docx'
+PDF_CLOSING_DATE = 'pdf_closing_date'
+
+# Workers are started with spawn: forking the multi-threaded app (Flask-SocketIO, scheduler,
+# crawl and log-writer threads) could copy a held lock into the child and deadlock it
+START_METHOD = 'spawn'
+
+# Keyword sets compiled inside a worker process, keyed by the keyword tuple
+_worker_keyword_sets = {}
+
+
+class ExtractionError(Exception):
+    """Raised when a document could not be extracted because its worker failed."""
+
+
+class ExtractionTimeoutError(ExtractionError):
+    """Raised when a document takes longer than the extraction timeout."""
+
+
+def _run_extraction(kind, content, options):
+    """Runs in a worker process: extracts text (and optionally the closing date) from one document."""
+    from webapp.routes.tenders import tender_utils
+
+    if kind == PDF:
+        return tender_utils.extract_pdf_text(content, options.get('max_pages'), options.get('max_chars'))
+    if kind == DOCX:
+        return tender_utils.extract_docx_text(content)
+    if kind == PDF_CLOSING_DATE:
+        keywords = options['closing_keywords']
+        closing_keywords = _worker_keyword_sets.get(keywords)
+        if closing_keywords is None:
+            if len(_worker_keyword_sets) >= 8:
+                _worker_keyword_sets.clear()
+            closing_keywords = _worker_keyword_sets[keywords] = KeywordSet(keywords)
+        return tender_utils.read_pdf_until_closing_date(
+            content, closing_keywords=closing_keywords,
+            max_pages=options.get('max_pages', tender_utils.PDF_MAX_PAGES),
+            max_chars=options.get('max_chars', tender_utils.PDF_MAX_CHARS))
+    raise ValueError(f"Unknown extraction kind: {kind}")
+
+
+def _worker_main(conn):
+    """Entry point of a worker process: extracts the documents sent over the pipe until it is closed."""
+    while True:
+        try:
+            kind, content, options = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = (True, _run_extraction(kind, content, options))
+        except Exception as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:  # The result or exception could not be pickled
+            conn.send((False, ExtractionError(f"{kind} extraction failed: {str(e)}")))
+
+
+class _Worker:
+    """One worker process and the pipe it receives documents on."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name='extraction-worker', daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        self.busy = False
+
+    def run(self, kind, content, options, timeout):
+        """Extracts one document; the timeout starts now, when the worker receives it."""
+        self.tasks += 1
+        self.busy = True
+        self.conn.send((kind, content, options))
+        if not self.conn.poll(timeout):
+            raise ExtractionTimeoutError(f"{kind} extraction timed out after {timeout}s")
+        ok, value = self.conn.recv()
+        self.busy = False
+        if not ok:
+            raise value
+        return value
+
+    def stop(self):
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=5)
+
+
+class ExtractionService:
+    """
+    Runs CPU-bound PDF and DOCX parsing in worker processes.
+
+    Parsing then no longer holds the GIL shared with the Flask request threads
+    and the crawl loop. Callers wait for an idle worker and hand it one
+    document; the timeout counts from that moment, so time spent queueing
+    behind other documents never times a document out. A worker that exceeds
+    the timeout is killed and replaced on its own, without touching the
+    documents other workers are busy with. Workers are also replaced after
+    max_tasks_per_child documents to cap memory growth.
+
+    Args:
+        workers (int): Worker processes; 0 runs extraction inline in the calling thread.
+        max_tasks_per_child (int): Documents a worker handles before it is replaced.
+        timeout (float): Default seconds allowed per document.
+
+    Usage:
+        extraction_service.start()  # At application startup
+        text = extraction_service.pdf_text(response.content)
+    """
+
+    def __init__(self, workers=EXTRACTION_WORKERS, max_tasks_per_child=EXTRACTION_MAX_TASKS_PER_CHILD,
+                 timeout=EXTRACTION_TIMEOUT):
+        self.workers = workers
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.timeout = timeout
+        self._context = multiprocessing.get_context(START_METHOD)
+        self._idle = None  # Queue of idle workers; None marks a slot whose worker must be (re)started
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def start(self):
+        """Starts the worker processes if they are not running yet in this process."""
+        if self.workers <= 0:
+            return
+        with self._lock:
+            if self._idle is not None and self._pid == os.getpid():
+                return
+            # Workers inherited from a parent process cannot be used here
+            self._idle = queue.Queue()
+            self._pid = os.getpid()
+            for _ in range(self.workers):
+                try:
+                    self._idle.put(_Worker(self._context))
+                except Exception as e:
+                    logging.error(f"Error starting an extraction worker: {str(e)}")
+                    self._idle.put(None)  # Retried when the slot is next used
+        logging.info(f"Started {self.workers} extraction worker processes.")
+
+    def extract(self, kind, content, timeout=None, **options):
+        """
+        Extracts one document and waits for the result.
+
+        Raises:
+            ExtractionTimeoutError: If the document is not done within the timeout.
+            ExtractionError: If its worker process died.
+        """
+        if self.workers <= 0:
+            return _run_extraction(kind, content, options)
+
+        timeout = self.timeout if timeout is None else timeout
+        self.start()
+        idle = self._idle
+        worker = idle.get()  # Waiting for a free worker does not count against the timeout
+        try:
+            if worker is None or not worker.process.is_alive():
+                worker = _Worker(self._context)
+            return worker.run(kind, content, options, timeout)
+        except ExtractionTimeoutError:
+            logging.error(f"{kind} extraction timed out after {timeout}s, replacing its worker.")
+            raise
+        except (EOFError, OSError) as e:
+            logging.error(f"{kind} extraction worker exited: {str(e)}")
+            raise ExtractionError(f"{kind} extraction worker exited")
+        finally:
+            # A worker that never answered is stuck or dead; one that is worn out is retired
+            if worker is not None and (worker.busy or not worker.process.is_alive()
+                                       or (self.max_tasks_per_child and worker.tasks >= self.max_tasks_per_child)):
+                worker.stop()
+                worker = None
+            idle.put(worker)
+
+    def pdf_text(self, content, max_pages=None, max_chars=None, timeout=None):
+        """Text of a PDF, see tender_utils.extract_pdf_text."""
+        return self.extract(PDF, content, timeout, max_pages=max_pages, max_chars=max_chars)
+
+    def docx_text(self, content, timeout=None):
+        """Text of a DOCX, see tender_utils.extract_docx_text."""
+        return self.extract(DOCX, content, timeout)
+
+    def pdf_closing_date(self, content, db_connection=None, timeout=None, **options):
+        """
+        Reads a PDF in a worker until its first usable closing date.
+
+        Returns:
+            tuple: (text, closing_date_match), see tender_utils.read_pdf_until_closing_date.
+        """
+        closing_keywords = keyword_registry.closing_keywords(db_connection).keywords
+        return self.extract(PDF_CLOSING_DATE, content, timeout, closing_keywords=closing_keywords, **options)
+
+    def close(self):
+        """Stops the idle worker processes, e.g. on application shutdown."""
+        with self._lock:
+            idle, self._idle = self._idle, None
+        if idle is None or self._pid != os.getpid():
+            return
+        while True:
+            try:
+                worker = idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.stop()
+
+
+# Shared extraction service used by the scrapers
+extraction_service = ExtractionService()
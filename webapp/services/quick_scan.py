@@ -25,6 +25,7 @@ def get_progress_log():
             "irrelevant_count": scraping_status['irrelevant_count'],
             "open_count": scraping_status['open_count'],
             "closed_count": scraping_status['closed_count'],
+            "progress": scraping_status.get('progress', 0),
             "tenders": scraping_status['tenders'],  # Return the detailed tenders
         }), 200
     except Exception as e:
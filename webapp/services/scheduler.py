@@ -3,6 +3,9 @@ from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
 import logging
 from datetime import datetime
 from webapp.config import get_db_connection
+from webapp.db import refresh_tender_statuses
+from webapp.cache.redis_cache import delete_cache
+from webapp.db.document_cache import document_cache
 from webapp.scrapers.ungm_tenders import scrape_ungm_tenders
 from webapp.scrapers.undp_tenders import scrape_undp_tenders
 from webapp.scrapers.ppip_tenders import scrape_ppip_tenders
@@ -114,10 +117,21 @@ def schedule_task_scrape(user_id, task_id, job_function, frequency, search_terms
     else:
         logging.warning(f'Unsupported frequency found while scheduling job {job_id}.')
 
+def refresh_statuses_job():
+    # Close tenders whose closing date has passed and drop the stale cached counts
+    if refresh_tender_statuses():
+        delete_cache('tender_counts_uploaded')
+
 def start_scheduler():
     # Load existing scheduled tasks from the database
     load_scheduled_tasks()
 
+    # Catch up on tenders that expired while the app was down, then keep statuses fresh hourly
+    refresh_statuses_job()
+    scheduler.add_job(refresh_statuses_job, 'interval', hours=1, id='refresh_tender_statuses', replace_existing=True)
+    # Drop extracted text of documents that have not been re-extracted for a while
+    scheduler.add_job(document_cache.prune, 'interval', days=1, id='prune_document_cache', replace_existing=True)
+
     # Start the scheduler
     scheduler.start()
 
@@ -0,0 +1,89 @@
+import hashlib
+import logging
+from webapp.cache.redis_cache import get_cache, set_cache
+from webapp.utils.http_client import http_client
+
+VALIDATORS_KEY_PREFIX = 'conditional_get:'
+VALIDATORS_TTL = 7 * 24 * 3600  # Forget validators after a week, so every page is fully re-read at least weekly
+
+
+def _validators_key(url):
+    return f"{VALIDATORS_KEY_PREFIX}{url}"
+
+
+class ConditionalPage:
+    """
+    Result of fetch_if_changed().
+
+    Attributes:
+        response (requests.Response): The response; a 304 has no body.
+        unchanged (bool): True when the page is the one that was last processed with the same fingerprint,
+            either because the server answered 304 or because the body hashes the same.
+    """
+
+    def __init__(self, url, response, fingerprint, stored):
+        self.url = url
+        self.response = response
+        self.fingerprint = fingerprint
+        self.content_hash = hashlib.sha256(response.content).hexdigest() if response.status_code == 200 else None
+
+        same_inputs = bool(stored) and stored.get('fingerprint') == fingerprint
+        self.unchanged = same_inputs and (
+            response.status_code == 304
+            or (self.content_hash is not None and stored.get('content_hash') == self.content_hash))
+
+    def mark_processed(self):
+        """
+        Remembers this page's validators so the next run can skip it while it is unchanged.
+
+        Call this only after the page was fully processed and saved, so a run that
+        failed half-way is repeated instead of skipped.
+        """
+        if self.response.status_code != 200:
+            return
+        set_cache(_validators_key(self.url), {
+            'etag': self.response.headers.get('ETag'),
+            'last_modified': self.response.headers.get('Last-Modified'),
+            'content_hash': self.content_hash,
+            'fingerprint': self.fingerprint,
+        }, expiry=VALIDATORS_TTL)
+
+
+def fetch_if_changed(url, fingerprint='', **kwargs):
+    """
+    Fetches a listing page with a conditional GET.
+
+    The ETag and Last-Modified of the last processed copy are kept in Redis
+    and sent back as If-None-Match and If-Modified-Since, so an unchanged page
+    costs a 304 without a body. Servers that ignore those headers are caught
+    by comparing a SHA-256 of the body instead.
+
+    Args:
+        url (str): The listing page URL.
+        fingerprint (str): Identifies the other inputs of the scrape, e.g. KeywordSet.fingerprint;
+            stored validators are ignored when it differs, so a keyword change forces a full run.
+        **kwargs: Passed on to http_client.get (headers, timeout, ...).
+
+    Returns:
+        ConditionalPage: The response and whether it is unchanged since the last processed run.
+
+    Usage:
+        page = fetch_if_changed(url, fingerprint=keyword_set.fingerprint)
+        if page.unchanged:
+            return
+        ... parse page.response and save the tenders ...
+        page.mark_processed()
+    """
+    stored = get_cache(_validators_key(url))
+    headers = dict(kwargs.pop('headers', None) or {})
+    if stored and stored.get('fingerprint') == fingerprint:
+        if stored.get('etag'):
+            headers['If-None-Match'] = stored['etag']
+        if stored.get('last_modified'):
+            headers['If-Modified-Since'] = stored['last_modified']
+
+    response = http_client.get(url, headers=headers, **kwargs)
+    page = ConditionalPage(url, response, fingerprint, stored)
+    if page.unchanged:
+        logging.info(f"{url} is unchanged since the last run ({response.status_code}).")
+    return page
@@ -0,0 +1,170 @@
+import re
+from datetime import datetime, date, time
+from functools import lru_cache
+
+DATE_CACHE_SIZE = 4096  # Distinct date strings remembered per process
+
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'may': 5, 'june': 6,
+    'july': 7, 'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+_ORDINAL_RE = re.compile(r'\b(\d+)(st|nd|rd|th)\b')
+_DAY_NAME_RE = re.compile(r'(?i)(monday|tuesday|wednesday|thursday|friday|saturday|sunday)')
+
+# Classifies the string shape in one match; the matched branch decides which fields to build from
+_DATE_SHAPE_RE = re.compile(r"""
+    ^(?:
+        # 2025-01-07
+        (?P<iso_y>\d{4})-(?P<iso_m>\d{1,2})-(?P<iso_d>\d{1,2})
+      | # 07/01/2025, 07-01-25, 07 01 2025
+        (?P<n1>\d{1,2})(?P<sep>[ /-])(?P<n2>\d{1,2})(?P=sep)(?P<n3>\d{4}|\d{2})
+      | # [10:00 AM on] 7 January[,] [2025] [10:00 [AM]]
+        (?:(?P<on_h>\d{1,2})(?::(?P<on_min>\d{1,2}))?\ ?(?P<on_p>[AP]M)?\ on\ )?
+        (?P<dm_d>\d{1,2})\ (?P<dm_mon>[a-z]+),?
+        (?:\ (?P<dm_y>\d{4}|\d{2}))?
+        (?:\ (?P<dm_h>\d{1,2}):(?P<dm_min>\d{1,2})(?:\ ?(?P<dm_p>[AP]M))?)?
+      | # January 7[,] [2025] [09:00 [AM]]
+        (?P<md_mon>[a-z]+)\ (?P<md_d>\d{1,2}),?
+        (?:\ (?P<md_y>\d{4}))?
+        (?:\ (?P<md_h>\d{1,2}):(?P<md_min>\d{1,2})(?:\ ?(?P<md_p>[AP]M))?)?
+    )$
+""", re.IGNORECASE | re.VERBOSE)
+
+# Day/month order to try for numeric dates, keyed by (separator, year digits)
+_NUMERIC_ORDERS = {
+    ('/', 4): ('dm', 'md'),
+    ('/', 2): ('md', 'dm'),
+    ('-', 4): ('dm', 'md'),
+    ('-', 2): ('dm', 'md'),
+    (' ', 4): ('dm',),
+    (' ', 2): ('dm',),
+}
+
+
+def normalize_date_string(date_str: str) -> str:
+    """
+    Cleans and formats the date string to a standard format.
+
+    Args:
+        date_str (str): The raw date string to clean.
+
+    Returns:
+        str: The string without ordinal suffixes or day names, with single spaces.
+    """
+    # Remove suffixes like "st", "nd", "rd", "th"
+    date_str = _ORDINAL_RE.sub(r'\1', date_str)
+    # Remove day names (e.g., "Monday")
+    date_str = _DAY_NAME_RE.sub('', date_str)
+    # Normalize whitespace
+    return ' '.join(date_str.split())
+
+
+def _year(value):
+    year = int(value)
+    if len(value) == 2:
+        year += 2000 if year < 69 else 1900  # Same pivot as strptime's %y
+    return year
+
+
+def _build_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _build_time(hour, minute, meridiem):
+    if hour is None:
+        return time()
+    hour = int(hour)
+    minute = int(minute or 0)
+    if minute > 59:
+        return None
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem.upper() == 'PM' else 0)
+    elif hour > 23:
+        return None
+    return time(hour, minute)
+
+
+def _parse_numeric(first, second, year_text, separator):
+    year = _year(year_text)
+    for order in _NUMERIC_ORDERS[(separator, len(year_text))]:
+        day, month = (first, second) if order == 'dm' else (second, first)
+        parsed = _build_date(year, int(month), int(day))
+        if parsed:
+            return parsed
+    return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse(date_str, current_year):
+    match = _DATE_SHAPE_RE.match(normalize_date_string(date_str))
+    if not match:
+        return None
+    fields = match.groupdict()
+
+    if fields['iso_y']:
+        parsed = _build_date(int(fields['iso_y']), int(fields['iso_m']), int(fields['iso_d']))
+        return datetime.combine(parsed, time()) if parsed else None
+
+    if fields['n1']:
+        parsed = _parse_numeric(fields['n1'], fields['n2'], fields['n3'], fields['sep'])
+        return datetime.combine(parsed, time()) if parsed else None
+
+    if fields['dm_d']:
+        prefix = 'dm'
+        hour, minute, meridiem = fields['dm_h'], fields['dm_min'], fields['dm_p']
+        if fields['on_h']:
+            if hour:
+                return None  # A time on both sides of the date is not a date we understand
+            hour, minute, meridiem = fields['on_h'], fields['on_min'], fields['on_p']
+    else:
+        prefix = 'md'
+        hour, minute, meridiem = fields['md_h'], fields['md_min'], fields['md_p']
+
+    month = MONTHS.get(fields[f'{prefix}_mon'].lower())
+    if month is None:
+        return None
+    # Dates without a year refer to the current one
+    year = _year(fields[f'{prefix}_y']) if fields[f'{prefix}_y'] else current_year
+    parsed = _build_date(year, month, int(fields[f'{prefix}_d']))
+    parsed_time = _build_time(hour, minute, meridiem)
+    if parsed is None or parsed_time is None:
+        return None
+    return datetime.combine(parsed, parsed_time)
+
+
+def parse_datetime(date_str):
+    """
+    Parses a date (and optional time of day) written in any of the shapes found on tender pages.
+
+    The shape is recognised by a single precompiled regular expression and the
+    date is built directly from its groups, instead of trying strptime formats
+    one after another. Results are cached per input string.
+
+    Args:
+        date_str (str): The raw date string, e.g. "7th January, 2025", "07/01/2025" or "Jan 9 2025 11:00".
+
+    Returns:
+        datetime: The parsed datetime (midnight when no time was given), or None if it is not a date.
+    """
+    if not date_str:
+        return None
+    return _parse(date_str, datetime.now().year)
+
+
+def parse_date(date_str):
+    """
+    Parses a date string into a datetime.date.
+
+    Returns:
+        datetime.date: The parsed date, or None if it is not a date.
+    """
+    parsed = parse_datetime(date_str)
+    return parsed.date() if parsed else None
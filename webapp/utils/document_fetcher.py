@@ -0,0 +1,189 @@
+import os
+import hashlib
+import logging
+import tempfile
+from webapp.config.config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, DOCUMENT_MAX_BYTES, DOCUMENT_SPOOL_BYTES
+from webapp.utils.http_client import http_client
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 2048  # Leading bytes inspected to recognise the real document type
+
+
+class DocumentTooLargeError(Exception):
+    """Raised when a document is larger than the configured download limit."""
+
+
+def sniff_format(head: bytes, content_type: str, url: str) -> str:
+    """
+    Determines the document format from its leading bytes and Content-Type header.
+
+    The URL suffix is only used when neither the bytes nor the header decide it,
+    since many tender links end in .aspx or carry no extension at all.
+
+    Args:
+        head (bytes): The first bytes of the body.
+        content_type (str): The Content-Type response header, may be empty.
+        url (str): The final URL of the document.
+
+    Returns:
+        str: 'PDF', 'DOCX' or 'HTML', or 'BINARY' for archives and spreadsheets that cannot be parsed.
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    lowered_url = url.lower().split('?')[0]
+
+    if head.lstrip()[:5] == b'%PDF-':
+        return 'PDF'
+    if head[:4] == b'PK\x03\x04':
+        # DOCX is a zip; tell it apart from xlsx/pptx/plain zips
+        if 'wordprocessingml' in content_type or lowered_url.endswith('.docx') or b'word/' in head:
+            return 'DOCX'
+        return 'HTML' if 'html' in content_type else 'BINARY'
+
+    if content_type == 'application/pdf':
+        return 'PDF'
+    if 'wordprocessingml' in content_type:
+        return 'DOCX'
+    if 'html' in content_type or 'xml' in content_type or content_type.startswith('text/'):
+        return 'HTML'
+
+    if lowered_url.endswith('.pdf'):
+        return 'PDF'
+    if lowered_url.endswith('.docx'):
+        return 'DOCX'
+    return 'HTML'
+
+
+class FetchedDocument:
+    """
+    A downloaded document, held in memory or spooled to a temporary file.
+
+    Small bodies stay in memory. Bodies over the spool threshold are written
+    to disk while streaming, so the scraper never holds a large dossier in
+    memory and PyMuPDF can open (and memory-map) the file directly.
+    Call close() (or use it as a context manager) to remove the temp file.
+    """
+
+    def __init__(self, url, status_code, headers, encoding, body=None, path=None, size=0, head=b'', content_hash=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.encoding = encoding
+        self.size = size
+        self.content_hash = content_hash  # SHA-256 of the body, computed while streaming
+        self.etag = headers.get('ETag')
+        self.last_modified = headers.get('Last-Modified')
+        self.content_type = headers.get('Content-Type', '')
+        self.format = sniff_format(head, self.content_type, url)
+        self._body = body
+        self._path = path
+
+    @property
+    def not_modified(self):
+        """True when the server answered a conditional request with 304 Not Modified."""
+        return self.status_code == 304
+
+    @property
+    def path(self):
+        """Path of the spooled temp file, or None if the body is in memory."""
+        return self._path
+
+    @property
+    def source(self):
+        """What the extractors should read: the temp file path if spooled, otherwise the bytes."""
+        return self._path if self._path else self._body
+
+    @property
+    def content(self):
+        """The body as bytes; reads the temp file when the document was spooled."""
+        if self._path:
+            with open(self._path, 'rb') as f:
+                return f.read()
+        return self._body
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def close(self):
+        if self._path:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+        self._body = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def fetch_document(url, headers=None, session=None, max_bytes=DOCUMENT_MAX_BYTES,
+                   spool_bytes=DOCUMENT_SPOOL_BYTES, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)):
+    """
+    Downloads a document with connect/read timeouts and a size cap, streaming the body.
+
+    Args:
+        url (str): The document URL.
+        headers (dict): HTTP headers for the request.
+        session: Client to send the request with, defaults to the shared pooled http_client.
+        max_bytes (int): Abort once the body exceeds this many bytes.
+        spool_bytes (int): Bodies larger than this are written to a temp file.
+        timeout (tuple): (connect, read) timeouts in seconds.
+
+    Returns:
+        FetchedDocument: The downloaded document. If the headers carry If-None-Match or
+        If-Modified-Since and the server answers 304, it has no body and not_modified is True.
+
+    Raises:
+        requests.exceptions.HTTPError: For 4xx/5xx responses.
+        DocumentTooLargeError: If the document exceeds max_bytes.
+    """
+    client = session or http_client
+    with client.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+
+        declared = response.headers.get('Content-Length')
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise DocumentTooLargeError(f"{url} is {int(declared)} bytes, over the {max_bytes} byte limit.")
+
+        chunks = []
+        head = b''
+        digest = hashlib.sha256()
+        size = 0
+        spool = None
+        try:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise DocumentTooLargeError(f"{url} exceeded the {max_bytes} byte limit while downloading.")
+                digest.update(chunk)
+                if len(head) < SNIFF_BYTES:
+                    head += chunk[:SNIFF_BYTES - len(head)]
+
+                if spool is None and size > spool_bytes:
+                    # Switch to disk and flush what was buffered so far
+                    spool = tempfile.NamedTemporaryFile(prefix='tender-', delete=False)
+                    spool.writelines(chunks)
+                    chunks = []
+                if spool is not None:
+                    spool.write(chunk)
+                else:
+                    chunks.append(chunk)
+        except BaseException:
+            if spool is not None:
+                spool.close()
+                os.remove(spool.name)
+            raise
+
+        if spool is not None:
+            spool.close()
+            logging.debug(f"Spooled {size} bytes from {url} to {spool.name}")
+            return FetchedDocument(response.url, response.status_code, response.headers, response.encoding,
+                                   path=spool.name, size=size, head=head, content_hash=digest.hexdigest())
+        return FetchedDocument(response.url, response.status_code, response.headers, response.encoding,
+                               body=b''.join(chunks), size=size, head=head, content_hash=digest.hexdigest())
@@ -0,0 +1,182 @@
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from webapp.config.config import (
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+    HTTP_MAX_RETRIES, HTTP_BACKOFF_FACTOR, HTTP_BACKOFF_MAX
+)
+from webapp.utils.rate_limiter import host_rate_limiter
+
+# List of common user agents to simulate different browsers
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:58.0) Gecko/20100101 Firefox/58.0',
+    'Mozilla/5.0 (Linux; Android 6.0; Nexus 6 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/56.0.2924.87 Mobile Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 10_0 like Mac OS X) AppleWebKit/602.1.50 (KHTML, like Gecko) Version/10.0 Mobile/14E277 Safari/602.1',
+]
+
+# Responses worth another attempt; anything else is returned to the caller as is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def random_headers():
+    """Request headers with a randomly chosen browser User-Agent."""
+    return {"User-Agent": random.choice(USER_AGENTS)}
+
+
+def retry_after_seconds(response):
+    """
+    Reads the Retry-After header of a response.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or unreadable.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HttpClient:
+    """
+    Shared HTTP client for the scrapers and outbound API calls.
+
+    One HTTPAdapter holds a keep-alive connection pool per host and is mounted
+    on a requests.Session per thread, so repeated requests to a host reuse
+    their TCP/TLS connection while cookies stay per thread. Every request gets
+    the default (connect, read) timeout and a rotating User-Agent unless the
+    caller sets them. Requests wait for their host's slot in the rate limiter,
+    so a single site or search engine is never hit faster than its interval.
+    Connection errors, timeouts, 429 and 5xx responses are retried with
+    exponential backoff and jitter, waiting for Retry-After when the server
+    sends it; the wait is applied to the host in the rate limiter, so other
+    threads back off from it too.
+
+    Args:
+        pool_connections (int): Number of hosts to keep a connection pool for.
+        pool_maxsize (int): Connections kept open per host.
+        max_retries (int): Retries per request after the first attempt.
+        backoff_factor (float): Retry n waits about backoff_factor * 2 ** n seconds.
+        backoff_max (float): Longest wait before a retry; a longer Retry-After is not waited for.
+        timeout (tuple): Default (connect, read) timeout in seconds.
+        rate_limiter (HostRateLimiter): Per-host limiter, or None to send requests immediately.
+
+    Usage:
+        response = http_client.get(url)
+        response = http_client.post(url, data=payload, retries=0)
+    """
+
+    def __init__(self, pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                 max_retries=HTTP_MAX_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR,
+                 backoff_max=HTTP_BACKOFF_MAX, timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 rate_limiter=host_rate_limiter):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """The calling thread's session, sharing the client's connection pools."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', self._adapter)
+            session.mount('https://', self._adapter)
+            self._local.session = session
+        return session
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number attempt + 1: exponential, capped, with jitter."""
+        delay = min(self.backoff_max, self.backoff_factor * 2 ** attempt)
+        # Half fixed, half random, so parallel scrapers hitting the same host spread out
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _pause(self, url, delay):
+        if self.rate_limiter is not None:
+            self.rate_limiter.defer(url, delay)  # Slept off by the next rate limiter wait
+        else:
+            time.sleep(delay)
+
+    def request(self, method, url, headers=None, timeout=None, retries=None, throttle=True, **kwargs):
+        """
+        Sends a request, retrying transient failures.
+
+        Args:
+            method (str): HTTP method.
+            url (str): The URL to request.
+            headers (dict): Request headers; a random User-Agent is added if missing.
+            timeout: (connect, read) timeout, defaults to the client's.
+            retries (int): Retries for this request, defaults to the client's max_retries.
+            throttle (bool): Wait for the host's rate limiter slot; disable for API calls made on behalf of a user.
+            **kwargs: Passed on to requests.Session.request (params, data, stream, ...).
+
+        Returns:
+            requests.Response: The final response, which may still be an error status.
+
+        Raises:
+            requests.RequestException: If the last attempt failed to connect or timed out.
+        """
+        headers = dict(headers or {})
+        headers.setdefault('User-Agent', random.choice(USER_AGENTS))
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.max_retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            if throttle and self.rate_limiter is not None:
+                self.rate_limiter.wait(url)
+            try:
+                response = self.session.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    raise
+                delay = self.backoff(attempt)
+                logging.warning(f"{method} {url} failed ({e.__class__.__name__}), retrying in {delay:.1f}s.")
+                self._pause(url, delay)
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = self.backoff(attempt)
+            elif delay > self.backoff_max:
+                logging.warning(f"{url} asked to retry after {delay:.0f}s, longer than {self.backoff_max:.0f}s; giving up.")
+                return response
+
+            response.close()  # Hand the connection back to the pool before sleeping
+            logging.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s.")
+            self._pause(url, delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """Closes the pooled connections of every thread."""
+        self._adapter.close()
+
+
+# Shared client used by the scrapers and routes
+http_client = HttpClient()
@@ -0,0 +1,147 @@
+import logging
+from collections import deque
+
+try:
+    import ahocorasick  # pyahocorasick, C implementation of the same automaton
+except ImportError:
+    ahocorasick = None
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive multi-keyword matcher built on an Aho-Corasick automaton.
+
+    The automaton is built once per keyword set and scans a text in a single
+    pass, however many keywords there are, instead of testing every keyword
+    against every document. Uses pyahocorasick when it is installed and falls
+    back to a pure-Python automaton otherwise.
+
+    Args:
+        keywords (iterable): Keywords to look for; duplicates (ignoring case) are dropped.
+        word_boundary (bool): Only report keywords that are not part of a longer word.
+
+    Usage:
+        matcher = KeywordMatcher(['ICT', 'Consultancy'])
+        matcher.find_all("Provision of ict consultancy services")  # ['ICT', 'Consultancy']
+    """
+
+    def __init__(self, keywords, word_boundary=False):
+        self.word_boundary = word_boundary
+        self.keywords = []  # Original case, in the order they were given
+        self._lengths = []
+
+        seen = set()
+        for keyword in keywords:
+            needle = keyword.lower() if keyword else ''
+            if not needle or needle in seen:
+                continue
+            seen.add(needle)
+            self.keywords.append(keyword)
+            self._lengths.append(len(needle))
+
+        if ahocorasick is not None and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for index, keyword in enumerate(self.keywords):
+                self._automaton.add_word(keyword.lower(), index)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._build([keyword.lower() for keyword in self.keywords])
+
+        logging.debug(f"Built keyword matcher for {len(self.keywords)} keywords.")
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _build(self, needles):
+        """Builds the goto, failure and output tables of the pure-Python automaton."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for index, needle in enumerate(needles):
+            state = 0
+            for ch in needle:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = next_state
+            self._out[state] += (index,)
+
+        # Breadth-first so each failure link points at an already finished state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def _scan(self, lowered):
+        """Yields (end_index, keyword_index) for every keyword occurrence."""
+        if self._automaton is not None:
+            yield from self._automaton.iter(lowered)
+            return
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for position, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                yield position, index
+
+    def iter_matches(self, text):
+        """
+        Scans the text once and yields every keyword occurrence.
+
+        Yields:
+            tuple: (start, end, keyword) with the keyword in its original case.
+        """
+        if not text or not self.keywords:
+            return
+
+        lowered = text.lower()
+        last = len(lowered) - 1
+        for end, index in self._scan(lowered):
+            start = end - self._lengths[index] + 1
+            if self.word_boundary and (
+                    (start > 0 and _is_word_char(lowered[start - 1]))
+                    or (end < last and _is_word_char(lowered[end + 1]))):
+                continue
+            yield start, end + 1, self.keywords[index]
+
+    def search(self, text):
+        """Returns the first keyword found in the text, or None. Stops at the first match."""
+        for _, _, keyword in self.iter_matches(text):
+            return keyword
+        return None
+
+    def find_all(self, text):
+        """
+        Returns the distinct keywords present in the text.
+
+        Returns:
+            list: Matched keywords in their original case, in keyword order.
+        """
+        found = set()
+        for _, _, keyword in self.iter_matches(text):
+            found.add(keyword)
+            if len(found) == len(self.keywords):
+                break
+        return [keyword for keyword in self.keywords if keyword in found]
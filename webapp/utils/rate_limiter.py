@@ -0,0 +1,98 @@
+import time
+import random
+import asyncio
+import threading
+from urllib.parse import urlparse
+from webapp.config.config import HOST_MIN_INTERVAL, HOST_INTERVAL_JITTER, SEARCH_ENGINE_MIN_INTERVAL
+
+# Search engines get a longer gap than the sites they link to
+SEARCH_ENGINE_DOMAINS = ('google.com', 'bing.com', 'yahoo.com', 'duckduckgo.com', 'ask.com')
+
+# Forget hosts whose slot has passed once this many are tracked
+PRUNE_THRESHOLD = 10000
+
+
+def host_of(url):
+    """Lower-cased host name of a URL, or '' if it has none."""
+    return (urlparse(url).hostname or '').lower()
+
+
+class HostRateLimiter:
+    """
+    Per-host politeness limiter.
+
+    Each host gets a minimum gap (plus jitter) between requests. Callers
+    reserve the next free slot of a host under a lock and then wait outside
+    it, so requests to different hosts never wait on each other while
+    concurrent requests to one host are spaced out in arrival order.
+
+    Args:
+        min_interval (float): Seconds between requests to the same host.
+        jitter (float): Up to this fraction of the interval is added at random.
+        domain_intervals (dict): Interval overrides for a domain and its subdomains.
+
+    Usage:
+        host_rate_limiter.wait(url)              # Blocking, for scraper threads
+        await host_rate_limiter.wait_async(url)  # From an event loop
+    """
+
+    def __init__(self, min_interval=HOST_MIN_INTERVAL, jitter=HOST_INTERVAL_JITTER, domain_intervals=None):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self.domain_intervals = dict(domain_intervals or {})
+        self._next_slot = {}  # host -> monotonic time of its next free slot
+        self._lock = threading.Lock()
+
+    def interval_for(self, host):
+        """Base interval for a host, honouring domain overrides."""
+        for domain, interval in self.domain_intervals.items():
+            if host == domain or host.endswith('.' + domain):
+                return interval
+        return self.min_interval
+
+    def reserve(self, url):
+        """
+        Books the next request slot of the URL's host.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+        host = host_of(url)
+        interval = self.interval_for(host)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + interval * (1 + random.uniform(0, self.jitter))
+            if len(self._next_slot) > PRUNE_THRESHOLD:
+                self._prune(now)
+        return slot - now
+
+    def defer(self, url, delay):
+        """Pushes a host's next slot at least delay seconds out, e.g. after 429 with Retry-After."""
+        host = host_of(url)
+        with self._lock:
+            not_before = time.monotonic() + delay
+            if self._next_slot.get(host, 0.0) < not_before:
+                self._next_slot[host] = not_before
+
+    def wait(self, url):
+        """Blocks until a request to the URL's host may be sent."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        """Waits, without blocking the event loop, until a request to the URL's host may be sent."""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _prune(self, now):
+        for host in [host for host, slot in self._next_slot.items() if slot <= now]:
+            del self._next_slot[host]
+
+
+# Shared limiter, so every scraper thread respects the same per-host gaps
+host_rate_limiter = HostRateLimiter(
+    domain_intervals={domain: SEARCH_ENGINE_MIN_INTERVAL for domain in SEARCH_ENGINE_DOMAINS}
+)